@@ -1,26 +1,41 @@
+import re
 import sys
 from typing import Optional, Dict, Any
 
 # Import the main engine
 from recommendation import generate_recommendation
 
+# Maximum number of invalid answers accepted per prompt before giving up
+MAX_INPUT_ATTEMPTS = 3
+
+# Plain decimal numbers such as "450", "-2", "12.5" or ".5"
+_NUMBER_RE = re.compile(r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)')
+
+def _exit_after_invalid_input():
+    """Helper to stop the application after too many invalid answers."""
+    print(f"Too many invalid inputs ({MAX_INPUT_ATTEMPTS}). Exiting application.")
+    sys.exit(1)
+
 def get_user_input_float(prompt: str, is_optional: bool = False) -> Optional[float]:
     """Helper to get a valid float from the user."""
-    while True:
+    for _ in range(MAX_INPUT_ATTEMPTS):
         try:
             response = input(prompt).strip()
             if is_optional and not response:
                 return None
+            if not _NUMBER_RE.fullmatch(response):
+                raise ValueError(response)
             return float(response)
         except ValueError:
             print("Invalid input. Please enter a valid number.")
         except (KeyboardInterrupt, EOFError):
             print("\nExiting application.")
             sys.exit(0)
+    _exit_after_invalid_input()
 
 def get_user_input_int(prompt: str, default: int) -> int:
     """Helper to get a valid integer from the user, with a default."""
-    while True:
+    for _ in range(MAX_INPUT_ATTEMPTS):
         try:
             response = input(prompt).strip()
             if not response:
@@ -31,6 +46,7 @@ def get_user_input_int(prompt: str, default: int) -> int:
         except (KeyboardInterrupt, EOFError):
             print("\nExiting application.")
             sys.exit(0)
+    _exit_after_invalid_input()
 
 def display_recommendation(rec: Dict[str, Any]):
     """Formats and prints the final recommendation to the console."""
@@ -38,62 +54,70 @@ def display_recommendation(rec: Dict[str, Any]):
         print("\nSorry, we could not generate a recommendation based on your inputs.")
         return
 
-    print("\n" + "="*50)
-    print("      Solar System Recommendation Report")
-    print("="*50)
+    # The report is assembled line by line and written to stdout in one call,
+    # which avoids a write (and flush) per line on slow terminals.
+    lines = []
+    lines.append("\n" + "="*50)
+    lines.append("      Solar System Recommendation Report")
+    lines.append("="*50)
 
     # --- System Requirements ---
     reqs = rec['user_requirements']
-    print("\n[+] Your Requirements:")
-    print(f"  - Monthly Energy Consumption: {reqs['monthly_kwh_consumption']} kWh")
+    lines.append("\n[+] Your Requirements:")
+    lines.append(f"  - Monthly Energy Consumption: {reqs['monthly_kwh_consumption']} kWh")
     if reqs['budget_ngn']:
-        print(f"  - Your Budget: {reqs['budget_ngn']:,.0f} NGN")
-    print(f"  - Desired Battery Autonomy: {reqs['days_of_autonomy']} day(s)")
+        lines.append(f"  - Your Budget: {reqs['budget_ngn']:,.0f} NGN")
+    lines.append(f"  - Desired Battery Autonomy: {reqs['days_of_autonomy']} day(s)")
 
     # --- Panel Recommendation ---
     panel_rec = rec['system_recommendation']['panel_recommendation']
-    print("\n[+] Panel Recommendation:")
-    print(f"  - Component: {panel_rec['number_of_panels']} x {panel_rec['panel_brand'].title()} {panel_rec['panel_model'].upper()} panels")
-    print(f"  - Power per Panel: {panel_rec['individual_panel_wattage']}W")
-    print(f"  - Total Array Power: {panel_rec['total_panel_wattage']}W")
+    lines.append("\n[+] Panel Recommendation:")
+    lines.append(f"  - Component: {panel_rec['number_of_panels']} x {panel_rec['panel_brand'].title()} {panel_rec['panel_model'].upper()} panels")
+    lines.append(f"  - Power per Panel: {panel_rec['individual_panel_wattage']}W")
+    lines.append(f"  - Total Array Power: {panel_rec['total_panel_wattage']}W")
 
     # --- Inverter Recommendation ---
     inverter_rec = rec['system_recommendation']['inverter_recommendation']
-    print("\n[+] Inverter Recommendation:")
-    print(f"  - Component: {inverter_rec['inverter_brand'].title()} {inverter_rec['inverter_model'].upper()}")
-    print(f"  - Inverter Rating: {inverter_rec['inverter_rating_kw']} kW")
+    lines.append("\n[+] Inverter Recommendation:")
+    lines.append(f"  - Component: {inverter_rec['inverter_brand'].title()} {inverter_rec['inverter_model'].upper()}")
+    lines.append(f"  - Inverter Rating: {inverter_rec['inverter_rating_kw']} kW")
 
     # --- Battery Recommendation ---
     battery_rec = rec['system_recommendation']['battery_recommendation']
-    print("\n[+] Battery Recommendation:")
-    print(f"  - Component: {battery_rec['number_of_batteries']} x {battery_rec['battery_brand'].title()} {battery_rec['battery_model'].upper()} batteries")
-    print(f"  - Total Usable Capacity: {battery_rec['total_battery_kwh_usable']:.1f} kWh")
+    lines.append("\n[+] Battery Recommendation:")
+    lines.append(f"  - Component: {battery_rec['number_of_batteries']} x {battery_rec['battery_brand'].title()} {battery_rec['battery_model'].upper()} batteries")
+    lines.append(f"  - Total Usable Capacity: {battery_rec['total_battery_kwh_usable']:.1f} kWh")
 
     # --- Cost Analysis ---
     cost = rec['cost_analysis']
-    print("\n[+] Estimated Cost Analysis:")
-    print(f"  - Panels Cost: {cost['panel_cost']:,.0f} NGN")
-    print(f"  - Inverter Cost: {cost['inverter_cost']:,.0f} NGN")
-    print(f"  - Batteries Cost: {cost['battery_cost']:,.0f} NGN")
-    print("  " + "-"*25)
-    print(f"  - Total Equipment Cost: {cost['total_equipment_cost']:,.0f} NGN")
-    print(f"  - Estimated Installation: {cost['estimated_installation_cost']:,.0f} NGN")
-    print("  " + "="*25)
-    print(f"  - TOTAL ESTIMATED SYSTEM COST: {cost['total_system_cost']:,.0f} NGN")
+    # Group the digits of each (already rounded) amount once, via the integer path
+    ngn = {k: format(round(v), ',') for k, v in cost.items() if isinstance(v, (int, float))}
+    lines.append("\n[+] Estimated Cost Analysis:")
+    lines.append(f"  - Panels Cost: {ngn['panel_cost']} NGN")
+    lines.append(f"  - Inverter Cost: {ngn['inverter_cost']} NGN")
+    lines.append(f"  - Batteries Cost: {ngn['battery_cost']} NGN")
+    lines.append("  " + "-"*25)
+    lines.append(f"  - Total Equipment Cost: {ngn['total_equipment_cost']} NGN")
+    lines.append(f"  - Estimated Installation: {ngn['estimated_installation_cost']} NGN")
+    lines.append("  " + "="*25)
+    lines.append(f"  - TOTAL ESTIMATED SYSTEM COST: {ngn['total_system_cost']} NGN")
 
     # --- Budget Verdict ---
     budget = rec['budget_analysis']
     if budget['is_within_budget'] is not None:
         if budget['is_within_budget']:
-            print("\n[+] Budget Verdict: ✅ This system is within your budget!")
+            lines.append("\n[+] Budget Verdict: ✅ This system is within your budget!")
         else:
-            print("\n[+] Budget Verdict: ❌ This system is over your budget.")
+            lines.append("\n[+] Budget Verdict: ❌ This system is over your budget.")
             over_by = cost['total_system_cost'] - reqs['budget_ngn']
-            print(f"     It is approximately {over_by:,.0f} NGN over.")
+            lines.append(f"     It is approximately {over_by:,.0f} NGN over.")
+
+    lines.append("\n" + "="*50)
+    lines.append("Disclaimer: All costs are estimates based on available data.")
+    lines.append("="*50)
 
-    print("\n" + "="*50)
-    print("Disclaimer: All costs are estimates based on available data.")
-    print("="*50)
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def main():
@@ -8,18 +8,27 @@ from system_sizing import size_complete_system, load_and_prepare_data
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def get_component_price(model: str, model_col: str, price_col: str, df: pd.DataFrame) -> float:
+# Keys a system recommendation must contain to be costed
+REQUIRED_RECOMMENDATION_KEYS = frozenset({'panel_recommendation', 'inverter_recommendation', 'battery_recommendation'})
+
+# Component DataFrames used to build price lookups when none were prepared at load time
+COMPONENT_KEYS = frozenset({'panels', 'inverters', 'batteries'})
+
+def build_price_lookup(df: pd.DataFrame, model_col: str, price_col: str) -> Dict[str, float]:
+    """Helper function to build a model -> price mapping from a component DataFrame."""
+    return dict(zip(df[model_col], df[price_col]))
+
+def get_component_price(model: str, kind: str, price_lookup: Dict[str, float]) -> float:
     """Helper function to look up the price of a specific component model."""
     try:
-        price = df.loc[df[model_col] == model, price_col].iloc[0]
-        return float(price)
-    except (IndexError, KeyError):
-        logging.warning(f"Could not find price for model '{model}' in column '{model_col}'. Defaulting to 0.")
+        return float(price_lookup[model])
+    except KeyError:
+        logging.warning(f"Could not find price for model '{model}' among {kind}. Defaulting to 0.")
         return 0.0
 
 def estimate_total_cost(
     system_recommendation: Dict[str, Any],
-    component_data: Dict[str, pd.DataFrame],
+    component_data: Dict[str, Any],
     installation_cost_percentage: float = 0.15
 ) -> Optional[Dict[str, Any]]:
     """
@@ -27,14 +36,17 @@ def estimate_total_cost(
 
     Args:
         system_recommendation (Dict): The dictionary output from size_complete_system.
-        component_data (Dict): The dictionary of component DataFrames.
+        component_data (Dict): The dictionary of component DataFrames (and, optionally,
+                               the 'prices' lookups from load_and_prepare_data).
         installation_cost_percentage (float): The percentage of equipment cost to add
                                               for installation. Defaults to 0.15 (15%).
 
     Returns:
         A dictionary with a detailed cost breakdown, or None if inputs are invalid.
     """
-    if not all(k in system_recommendation for k in ['panel_recommendation', 'inverter_recommendation', 'battery_recommendation']):
+    # Validate cheapest-first (dict membership before any DataFrame access) so
+    # invalid input bails out without building or scanning price data.
+    if not REQUIRED_RECOMMENDATION_KEYS.issubset(system_recommendation):
         logging.error("Invalid system_recommendation object provided.")
         return None
 
@@ -42,19 +54,32 @@ def estimate_total_cost(
     inverter_rec = system_recommendation['inverter_recommendation']
     battery_rec = system_recommendation['battery_recommendation']
 
-    panels_df = component_data['panels']
-    inverters_df = component_data['inverters']
-    batteries_df = component_data['batteries']
+    if not (panel_rec and inverter_rec and battery_rec):
+        logging.error("System recommendation is missing a panel, inverter or battery configuration.")
+        return None
+
+    prices = component_data.get('prices')
+    if not prices and not COMPONENT_KEYS.issubset(component_data):
+        logging.error("Component data has neither price lookups nor component DataFrames.")
+        return None
 
     price_col = 'Component_Price_NGN' # Using Nigerian Naira for costing
 
+    # Reuse the price lookups prepared at load time; build them only if absent.
+    if not prices:
+        prices = {
+            "panels": build_price_lookup(component_data['panels'], 'Panel_Model', price_col),
+            "inverters": build_price_lookup(component_data['inverters'], 'Inverter_Model', price_col),
+            "batteries": build_price_lookup(component_data['batteries'], 'Battery_Model', price_col)
+        }
+
     # 1. Calculate cost of each component type
-    panel_price_per_unit = get_component_price(panel_rec['panel_model'], 'Panel_Model', price_col, panels_df)
+    panel_price_per_unit = get_component_price(panel_rec['panel_model'], 'panels', prices['panels'])
     total_panel_cost = panel_price_per_unit * panel_rec['number_of_panels']
 
-    inverter_price = get_component_price(inverter_rec['inverter_model'], 'Inverter_Model', price_col, inverters_df)
+    inverter_price = get_component_price(inverter_rec['inverter_model'], 'inverters', prices['inverters'])
 
-    battery_price_per_unit = get_component_price(battery_rec['battery_model'], 'Battery_Model', price_col, batteries_df)
+    battery_price_per_unit = get_component_price(battery_rec['battery_model'], 'batteries', prices['batteries'])
     total_battery_cost = battery_price_per_unit * battery_rec['number_of_batteries']
 
     # 2. Calculate total equipment cost
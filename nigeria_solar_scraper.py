@@ -1,523 +1,1004 @@
-22#!/usr/bin/env python3
-"""
-nigeria_solar_scraper.py
-
-Scrapes solar panels, solar batteries, and inverters from Jumia, Konga, and Jiji.
-Supports:
- - list page scraping
- - product detail page visits for structured specs
- - Playwright (Chromium) for JS-heavy pages, with aiohttp fallback
- - simple rate limiting and concurrency control
- - CSV output per site
-
-Usage:
-  python nigeria_solar_scraper.py    # runs an interactive menu
-"""
-
-import asyncio
-import json
-import logging
-import os
-import random
-import re
-import time
-from dataclasses import dataclass, asdict
-from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-import aiofiles
-import aiohttp
-import pandas as pd
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from tenacity import retry, stop_after_attempt, wait_exponential
-
-# Optional playwright import — script will detect if available
-try:
-    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-    PLAYWRIGHT_AVAILABLE = True
-except Exception:
-    PLAYWRIGHT_AVAILABLE = False
-
-# For notebooks/Colab: allow nested event loops when needed
-try:
-    import nest_asyncio
-    nest_asyncio.apply()
-except Exception:
-    pass
-
-# Logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
-logger = logging.getLogger(__name__)
-
-# --------------- Data models ----------------
-@dataclass
-class ScrapedItem:
-    name: Optional[str] = None
-    brand: Optional[str] = None
-    model: Optional[str] = None
-    price_raw: Optional[str] = None
-    price_cleaned: Optional[float] = None
-    currency: Optional[str] = None
-    product_url: Optional[str] = None
-    image_url: Optional[str] = None
-    all_image_urls: Optional[List[str]] = None
-    description: Optional[str] = None
-    specs: Optional[Dict[str, Any]] = None
-    rating: Optional[float] = None
-    reviews_count: Optional[int] = None
-    availability: Optional[str] = None
-    seller: Optional[str] = None
-    location: Optional[str] = None
-    condition: Optional[str] = None
-    scraped_at: Optional[str] = None
-    source_site: Optional[str] = None
-    raw_html_path: Optional[str] = None
-
-    def __post_init__(self):
-        if self.scraped_at is None:
-            self.scraped_at = datetime.utcnow().isoformat()
-        if self.price_raw and (self.price_cleaned is None):
-            self.price_cleaned, self.currency = self._extract_price(self.price_raw)
-        if self.specs is None:
-            self.specs = {}
-        if self.all_image_urls is None:
-            self.all_image_urls = []
-
-    def _extract_price(self, price_str: str) -> Tuple[Optional[float], Optional[str]]:
-        if not price_str:
-            return None, None
-        # detect currency
-        currency = "NGN"
-        if "$" in price_str:
-            currency = "USD"
-        if "₦" in price_str:
-            currency = "NGN"
-        # strip non-numeric except dot and comma, then remove commas
-        only_nums = re.sub(r"[^\d.,]", "", price_str).replace(",", "")
-        try:
-            return float(only_nums) if only_nums else None, currency
-        except Exception:
-            return None, currency
-
-    def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        # keep specs as json string for CSV compatibility
-        d["specs"] = json.dumps(d.get("specs") or {}, ensure_ascii=False)
-        return d
-
-# --------------- Site configuration ----------------
-@dataclass
-class SiteConfig:
-    name: str
-    start_urls: List[str]
-    list_selector: str
-    selectors: Dict[str, str]             # selectors relative to list item
-    requires_js: bool = False
-    max_pages: int = 2
-    delay_range: Tuple[float, float] = (1.5, 3.5)
-    concurrent_requests: int = 3
-    rate_limit_per_minute: int = 30       # tokens
-
-# --------------- Rate limiter ----------------
-class RateLimiter:
-    def __init__(self, rate_per_minute: int):
-        self.tokens = rate_per_minute
-        self.max_tokens = rate_per_minute
-        self.refill_period = 60.0
-        self.last_refill = time.time()
-
-    async def acquire(self):
-        while True:
-            now = time.time()
-            elapsed = now - self.last_refill
-            if elapsed >= self.refill_period:
-                self.tokens = self.max_tokens
-                self.last_refill = now
-            if self.tokens > 0:
-                self.tokens -= 1
-                return
-            await asyncio.sleep(1.0)
-
-# --------------- Scraper class ----------------
-class NigeriaSolarScraper:
-    def __init__(self, output_dir: str = "./scraped_data"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.ua = UserAgent()
-        self.rate_limiters: Dict[str, RateLimiter] = {}
-        self.session: Optional[aiohttp.ClientSession] = None
-
-    def _headers(self):
-        return {
-            "User-Agent": self.ua.random,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5"
-        }
-
-    async def _fetch_static(self, url: str) -> Optional[str]:
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
-        try:
-            async with self.session.get(url, headers=self._headers()) as resp:
-                if resp.status != 200:
-                    logger.warning(f"Non-200 {resp.status} for {url}")
-                    return None
-                return await resp.text()
-        except Exception as e:
-            logger.error(f"Static fetch error for {url}: {e}")
-            return None
-
-    async def _fetch_playwright(self, browser, url: str, block_images: bool = True) -> Optional[str]:
-        try:
-            context = await browser.new_context(user_agent=self.ua.random, viewport={"width":1280,"height":800})
-            page = await context.new_page()
-            if block_images:
-                await page.route("**/*.{png,jpg,jpeg,gif,svg}", lambda r: r.abort())
-            await page.goto(url, wait_until="domcontentloaded", timeout=45000)
-            await asyncio.sleep(1.0)  # small wait for dynamic loads
-            content = await page.content()
-            await context.close()
-            return content
-        except Exception as e:
-            logger.error(f"Playwright fetch error for {url}: {e}")
-            return None
-
-    def _extract_from_list_item(self, item_soup: BeautifulSoup, config: SiteConfig, base_url: str) -> ScrapedItem:
-        s = config.selectors
-        def safe_select_text(sel):
-            el = item_soup.select_one(sel) if sel else None
-            return el.get_text(strip=True) if el else None
-
-        def safe_select_attr(sel, attr="href"):
-            el = item_soup.select_one(sel) if sel else None
-            if not el:
-                return None
-            return el.get(attr) or None
-
-        name = safe_select_text(s.get("name"))
-        price_raw = safe_select_text(s.get("price"))
-        product_rel = safe_select_attr(s.get("product_url"), "href")
-        product_url = None
-        if product_rel:
-            if product_rel.startswith("http"):
-                product_url = product_rel
-            else:
-                product_url = base_url.rstrip("/") + "/" + product_rel.lstrip("/")
-
-        image = safe_select_attr(s.get("image"), "src") or safe_select_attr(s.get("image"), "data-src")
-        if image and image.startswith("//"):
-            image = "https:" + image
-
-        item = ScrapedItem(
-            name=name,
-            price_raw=price_raw,
-            product_url=product_url,
-            image_url=image,
-            source_site=config.name
-        )
-        return item
-
-    def _parse_product_detail(self, html: str, base_url: str, item: ScrapedItem) -> ScrapedItem:
-        soup = BeautifulSoup(html, "lxml")
-        # description
-        desc_tag = soup.select_one("meta[name='description']") or soup.select_one(".description") or soup.select_one(".product-description")
-        if desc_tag:
-            item.description = desc_tag.get("content") if desc_tag.has_attr("content") else desc_tag.get_text(" ", strip=True)
-        # images — find many images
-        imgs = []
-        for img in soup.select("img"):
-            src = img.get("data-src") or img.get("src") or ""
-            if src and src not in imgs and len(src) > 10:
-                if src.startswith("//"):
-                    src = "https:" + src
-                imgs.append(src)
-        item.all_image_urls = imgs[:10]
-        if not item.image_url and imgs:
-            item.image_url = imgs[0]
-        # specs tables
-        specs = {}
-        # Common patterns: <table class="specs">, <ul class="specs">, <div class="specs">
-        # Table-based
-        for table in soup.select("table"):
-            # try to parse key/value rows
-            for tr in table.select("tr"):
-                tds = tr.select("td")
-                if len(tds) >= 2:
-                    k = tds[0].get_text(" ", strip=True)
-                    v = tds[1].get_text(" ", strip=True)
-                    if k:
-                        specs[k] = v
-        # list-based key/value
-        for li in soup.select("ul li"):
-            text = li.get_text(" ", strip=True)
-            if ":" in text:
-                k, v = text.split(":", 1)
-                specs[k.strip()] = v.strip()
-        # specific key heuristics from description
-        text_blob = (item.description or "") + " " + " ".join(img.get_text(" ", strip=True) for img in soup.select("p"))
-        # Extract simple fields via regex heuristics (wattage, Ah, V, type)
-        watt_match = re.search(r"(\d{2,4})\s*[Ww]\b", text_blob)
-        if watt_match and "Watt" not in specs:
-            specs["Watt"] = watt_match.group(1) + " W"
-        ah_match = re.search(r"(\d{2,4})\s*(Ah|ah)\b", text_blob)
-        if ah_match and "Capacity" not in specs:
-            specs["Capacity"] = ah_match.group(1) + " Ah"
-        type_match = re.search(r"(mono(?:crystalline)?|poly(?:crystalline)?|monocrystalline|polycrystalline|PERC)", text_blob, re.I)
-        if type_match and "Type" not in specs:
-            specs["Type"] = type_match.group(1)
-        # brand/model heuristics from title
-        if item.name:
-            bm = re.split(r"[-|/]", item.name)
-            if len(bm) >= 2:
-                item.brand = bm[0].strip()
-                item.model = bm[1].strip() if len(bm) > 1 else item.model
-        item.specs.update(specs)
-        return item
-
-    async def _save_item_html(self, html: str, site_name: str, slug: str) -> str:
-        fn = self.output_dir / f"{site_name}_{slug}_{int(time.time())}.html"
-        try:
-            async with aiofiles.open(fn, "w", encoding="utf-8") as f:
-                await f.write(html)
-            return str(fn)
-        except Exception:
-            return ""
-
-    async def scrape_site(self, config: SiteConfig, search_keyword: str = None) -> List[ScrapedItem]:
-        logger.info(f"Starting scrape for {config.name}")
-        # rate limiter for site
-        rl = RateLimiter(config.rate_limit_per_minute)
-        self.rate_limiters[config.name] = rl
-        items: List[ScrapedItem] = []
-
-        # optionally substitute search keywords in start_urls
-        start_urls = []
-        for u in config.start_urls:
-            if "{q}" in u:
-                start_urls.append(u.replace("{q}", (search_keyword or "solar").replace(" ", "+")))
-            else:
-                start_urls.append(u)
-
-        # Decide whether to use Playwright or static
-        playwright_context = None
-        browser = None
-
-        if config.requires_js and PLAYWRIGHT_AVAILABLE:
-            try:
-                playwright_context = await async_playwright().start()
-                browser = await playwright_context.chromium.launch(headless=True)
-                logger.info("Playwright launched for JS site")
-            except Exception as e:
-                logger.warning(f"Playwright failed to start: {e}. Falling back to static fetches.")
-                browser = None
-
-        sem = asyncio.Semaphore(config.concurrent_requests)
-
-        async def process_list_page(url: str):
-            async with sem:
-                await rl.acquire()
-                logger.info(f"Fetching list page: {url}")
-                content = None
-                if browser:
-                    content = await self._fetch_playwright(browser, url)
-                else:
-                    content = await self._fetch_static(url)
-                if not content:
-                    return
-                soup = BeautifulSoup(content, "lxml")
-                list_nodes = soup.select(config.list_selector)
-                logger.info(f"Found {len(list_nodes)} list nodes on {url}")
-                for node in list_nodes:
-                    item = self._extract_from_list_item(node, config, base_url=url)
-                    # only items with at least a name or product_url
-                    if item.name or item.product_url:
-                        items.append(item)
-
-        # fetch list pages (concurrently but limited)
-        tasks = []
-        for url in start_urls[: config.max_pages]:
-            tasks.append(asyncio.create_task(process_list_page(url)))
-            await asyncio.sleep(random.uniform(*config.delay_range))
-        await asyncio.gather(*tasks)
-
-        # visit detail pages for richer info
-        async def process_detail(item: ScrapedItem):
-            if not item.product_url:
-                return
-            async with sem:
-                await rl.acquire()
-                logger.info(f"Visiting detail: {item.product_url}")
-                content = None
-                if browser:
-                    content = await self._fetch_playwright(browser, item.product_url)
-                else:
-                    content = await self._fetch_static(item.product_url)
-                if not content:
-                    logger.warning(f"No content for detail: {item.product_url}")
-                    return
-                # save HTML optionally
-                slug = re.sub(r"[^a-zA-Z0-9_-]", "_", (item.name or "product"))[:40]
-                raw_path = await self._save_item_html(content, config.name, slug)
-                if raw_path:
-                    item.raw_html_path = raw_path
-                # parse detail
-                self._parse_product_detail(content, base_url=item.product_url, item=item)
-                await asyncio.sleep(random.uniform(0.5, 1.7))
-
-        detail_tasks = [asyncio.create_task(process_detail(it)) for it in items if it.product_url]
-        # limit concurrency
-        if detail_tasks:
-            # process in batches
-            batch_size = config.concurrent_requests * 2
-            for i in range(0, len(detail_tasks), batch_size):
-                await asyncio.gather(*detail_tasks[i : i + batch_size])
-
-        # close Playwright if used
-        if playwright_context:
-            try:
-                await browser.close()
-                await playwright_context.stop()
-            except Exception:
-                pass
-
-        # close aiohttp session
-        if self.session:
-            try:
-                await self.session.close()
-            except Exception:
-                pass
-            self.session = None
-
-        # deduplicate by product_url or name+price
-        unique = {}
-        final_items = []
-        for it in items:
-            key = it.product_url or f"{it.name}_{it.price_cleaned}"
-            if key and key not in unique:
-                unique[key] = True
-                final_items.append(it)
-        logger.info(f"Scraping finished for {config.name}. Items collected: {len(final_items)}")
-        return final_items
-
-    async def save_to_csv(self, items: List[ScrapedItem], site_name: str) -> str:
-        if not items:
-            logger.warning("No items to save")
-            return ""
-        df = pd.DataFrame([i.to_dict() for i in items])
-        fn = self.output_dir / f"{site_name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(fn, index=False)
-        logger.info(f"Saved {len(items)} items to {fn}")
-        return str(fn)
-
-
-# --------------- Site configs (Jumia, Konga, Jiji) ---------------
-def get_default_configs() -> List[SiteConfig]:
-    return [
-        SiteConfig(
-            name="jumia",
-            start_urls=[
-                "https://www.jumia.com.ng/catalog/?q=solar+battery/",
-                "https://www.jumia.com.ng/catalog/?q=solar+panel/",
-                "https://www.jumia.com.ng/catalog/?q=solar+inverter/"
-            ],
-            list_selector="article.prd",
-            selectors={
-                "name": ".info .name, .name",
-                "price": ".prc, .price",
-                "product_url": "a.core, a[href]",
-                "image": ".img img"
-            },
-            requires_js=False,
-            max_pages=3,
-            delay_range=(1.0, 2.5),
-            concurrent_requests=3,
-            rate_limit_per_minute=100
-        ),
-        SiteConfig(
-            name="konga",
-            start_urls=[
-                "https://www.konga.com/search?search={q}"
-            ],
-            list_selector=".product",
-            selectors={
-                "name": ".name, .product-title",
-                "price": ".price, .sale-price",
-                "product_url": "a",
-                "image": "img"
-            },
-            requires_js=True,
-            max_pages=2,
-            delay_range=(2.5, 4.0),
-            concurrent_requests=2,
-            rate_limit_per_minute=30
-        ),
-        SiteConfig(
-            name="jiji",
-            start_urls=[
-                "https://jiji.ng/search?query={q}",
-                "https://jiji.ng/solar-panels"
-            ],
-            list_selector=".qa-advert-list-item, [data-cy='ad-card']",
-            selectors={
-                "name": ".qa-advert-list-title, [data-cy='ad-title']",
-                "price": ".qa-advert-price, [data-cy='ad-price']",
-                "product_url": "a[href*='/ad/']",
-                "image": ".qa-advert-list-photo img"
-            },
-            requires_js=True,
-            max_pages=2,
-            delay_range=(3.0, 5.0),
-            concurrent_requests=2,
-            rate_limit_per_minute=25
-        )
-    ]
-
-# --------------- CLI / main ----------------
-async def main():
-    print("Nigeria Solar Scraper")
+22#!/usr/bin/env python3
+"""
+nigeria_solar_scraper.py
+
+Scrapes solar panels, solar batteries, and inverters from Jumia, Konga, and Jiji.
+Supports:
+ - list page scraping
+ - product detail page visits for structured specs
+ - Playwright (Chromium) for JS-heavy pages, with httpx (HTTP/2) fallback
+ - simple rate limiting and concurrency control
+ - CSV output per site, streamed to disk as items complete
+
+Usage:
+  python nigeria_solar_scraper.py    # runs an interactive menu
+"""
+
+import asyncio
+import csv
+import functools
+import io
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict, field, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import aiofiles
+import httpx
+from fake_useragent import UserAgent
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+# Optional playwright import — script will detect if available
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+    PLAYWRIGHT_AVAILABLE = True
+except Exception:
+    PLAYWRIGHT_AVAILABLE = False
+
+# Optional h2 import — enables HTTP/2 (one multiplexed connection per host)
+# for static fetches; httpx falls back to HTTP/1.1 without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except Exception:
+    HTTP2_AVAILABLE = False
+
+# Optional uvloop import — faster event loop (not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except Exception:
+    UVLOOP_AVAILABLE = False
+
+# Optional lz4 import — compresses the saved raw HTML (~6x smaller on disk)
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except Exception:
+    LZ4_AVAILABLE = False
+
+# Optional pybloom_live import — fixed-memory crawl-wide URL dedupe; a plain
+# set (exact, but grows with the crawl) is used without it
+try:
+    from pybloom_live import BloomFilter
+    BLOOM_AVAILABLE = True
+except Exception:
+    BLOOM_AVAILABLE = False
+
+# For notebooks/Colab: allow nested event loops when needed
+try:
+    import nest_asyncio
+    nest_asyncio.apply()
+except Exception:
+    pass
+
+# Logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+# httpx logs every request at INFO; we already log fetches ourselves
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Detail pages are parsed once, from the raw bytes, into a single lxml tree;
+# every extractor below runs precompiled selectors against that tree
+# Description sources, in order of preference
+_DETAIL_DESC_SELECTORS = tuple(CSSSelector(sel) for sel in ("meta[name='description']", ".description", ".product-description"))
+# The first 20 <img> tags carrying a source URL (we keep at most 10)
+_DETAIL_IMG_XP = etree.XPath("(//img[@src or @data-src])[position() <= 20]")
+_TABLE_ROWS_XP = etree.XPath("//table//tr")
+_ROW_CELLS_XP = etree.XPath(".//td")
+_LIST_ITEMS_XP = etree.XPath("//ul//li")
+_PARAGRAPHS_XP = etree.XPath("//p")
+
+# Precompiled patterns used on every scraped item / detail page
+_PRICE_STRIP_RE = re.compile(r"[^\d.,]")
+# Fast path for price strings: delete every ASCII character except digits,
+# '.' and ',' (and the naira sign) with str.translate; the regex above only
+# runs if other non-ASCII characters remain
+_PRICE_KEEP = frozenset("0123456789.,")
+_PRICE_TRANS = str.maketrans("", "", "".join(chr(c) for c in range(128) if chr(c) not in _PRICE_KEEP) + "₦")
+# Currency symbol -> code, in precedence order; NGN when none is present
+_CURRENCY_SYMBOLS = {"₦": "NGN", "$": "USD"}
+# Wattage / Ah capacity / cell type heuristics, combined so the text is
+# scanned once; the group that matched names the spec it fills
+_SPEC_RE = re.compile(
+    r"(?P<watt>\d{2,4})\s*[Ww]\b"
+    r"|(?P<ah>\d{2,4})\s*(?:Ah|ah)\b"
+    r"|(?P<type>(?i:mono(?:crystalline)?|poly(?:crystalline)?|PERC))"
+)
+# regex group -> (spec key, suffix appended to the matched text)
+_SPEC_FIELDS = {"watt": ("Watt", " W"), "ah": ("Capacity", " Ah"), "type": ("Type", "")}
+_NAME_SPLIT_RE = re.compile(r"[-|/]")
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9_-]")
+# Text nodes under an element, minus <script>/<style> contents (as get_text skipped)
+_TEXT_NODES_XP = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]", smart_strings=False)
+
+# Playwright requests we never need for HTML scraping: heavy static assets and
+# third-party trackers. Aborted at the context level for every page it opens.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet", "other"})
+_BLOCKED_URL_PARTS = ("google-analytics", "doubleclick", "facebook.net", "hotjar")
+
+
+async def _block_unneeded_requests(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(h in request.url for h in _BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def _product_url_key(url: str) -> str:
+    """Dedupe key for a product URL: its own query string and fragment are
+    dropped (tracking parameters) and the scheme and host lowercased."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, "", ""))
+
+def _element_text(el: etree._Element) -> str:
+    """Whitespace-stripped text fragments of `el` joined by single spaces."""
+    return " ".join(t for t in (t.strip() for t in _TEXT_NODES_XP(el)) if t)
+
+# --------------- Detail-page extraction ----------------
+@functools.lru_cache(maxsize=None)
+def _detail_parser(encoding: str) -> lxml_html.HTMLParser:
+    """One HTML parser per page encoding; raises LookupError if libxml2 lacks it."""
+    return lxml_html.HTMLParser(encoding=encoding)
+
+def _parse_detail_tree(content: bytes, encoding: str = "utf-8") -> Optional[etree._Element]:
+    """Parse raw page bytes, decoding them as `encoding` (the response charset)."""
+    try:
+        parser = _detail_parser(encoding)
+    except LookupError:
+        # a codec name Python knows but libxml2 doesn't: transcode to UTF-8 first
+        content = content.decode(encoding, errors="replace").encode("utf-8")
+        parser = _detail_parser("utf-8")
+    try:
+        return lxml_html.fromstring(content, parser=parser)
+    except etree.ParserError as e:
+        logger.warning(f"Could not parse detail HTML: {e}")
+        return None
+
+def _extract_description(tree: etree._Element) -> Optional[str]:
+    for sel in _DETAIL_DESC_SELECTORS:
+        found = sel(tree)
+        if found:
+            content_attr = found[0].get("content")
+            return content_attr if content_attr is not None else _element_text(found[0])
+    return None
+
+def _extract_images(tree: etree._Element) -> List[str]:
+    # libxml2 picks the candidate <img> tags; we dedupe and keep usable URLs
+    imgs = []
+    for src in (img.get("data-src") or img.get("src") or "" for img in _DETAIL_IMG_XP(tree)):
+        if src and src not in imgs and len(src) > 10:
+            imgs.append(src)
+    return ["https:" + src if src.startswith("//") else src for src in imgs]
+
+def _extract_specs_from_tables(tree: etree._Element) -> Dict[str, str]:
+    # key/value rows: first cell is the key, second the value
+    specs = {}
+    for tr in _TABLE_ROWS_XP(tree):
+        tds = _ROW_CELLS_XP(tr)
+        if len(tds) >= 2:
+            k = _element_text(tds[0])
+            if k:
+                specs[k] = _element_text(tds[1])
+    return specs
+
+def _extract_specs_from_lists(tree: etree._Element) -> Dict[str, str]:
+    # "Key: value" list items
+    specs = {}
+    for li in _LIST_ITEMS_XP(tree):
+        text = _element_text(li)
+        if ":" in text:
+            k, v = text.split(":", 1)
+            specs[k.strip()] = v.strip()
+    return specs
+
+def _extract_paragraph_text(tree: etree._Element) -> str:
+    return " ".join(_element_text(p) for p in _PARAGRAPHS_XP(tree))
+
+def _extract_specs_from_text(text: str, known: Dict[str, Any]) -> Dict[str, str]:
+    """Wattage / Ah / cell type found in free text, for keys not in `known`."""
+    # the first match of each kind wins; stop once every field is filled
+    pending = {g for g, (key, _) in _SPEC_FIELDS.items() if key not in known}
+    found = {}
+    if pending:
+        for m in _SPEC_RE.finditer(text):
+            group = m.lastgroup
+            if group in pending:
+                found[group] = m.group(group)
+                pending.discard(group)
+                if not pending:
+                    break
+    # fill in a fixed order so the specs JSON keeps a stable key order
+    return {key: found[group] + suffix for group, (key, suffix) in _SPEC_FIELDS.items() if group in found}
+
+# --------------- Data models ----------------
+@dataclass
+class ScrapedItem:
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    price_raw: Optional[str] = None
+    price_cleaned: Optional[float] = None
+    currency: Optional[str] = None
+    product_url: Optional[str] = None
+    image_url: Optional[str] = None
+    all_image_urls: Optional[List[str]] = None
+    description: Optional[str] = None
+    specs: Optional[Dict[str, Any]] = None
+    rating: Optional[float] = None
+    reviews_count: Optional[int] = None
+    availability: Optional[str] = None
+    seller: Optional[str] = None
+    location: Optional[str] = None
+    condition: Optional[str] = None
+    scraped_at: Optional[str] = None
+    source_site: Optional[str] = None
+    raw_html_path: Optional[str] = None
+
+    def __post_init__(self):
+        if self.scraped_at is None:
+            self.scraped_at = datetime.utcnow().isoformat()
+        if self.price_raw and (self.price_cleaned is None):
+            self.price_cleaned, self.currency = self._extract_price(self.price_raw)
+        if self.specs is None:
+            self.specs = {}
+        if self.all_image_urls is None:
+            self.all_image_urls = []
+
+    def _extract_price(self, price_str: str) -> Tuple[Optional[float], Optional[str]]:
+        if not price_str:
+            return None, None
+        # detect currency
+        currency = next((code for sym, code in _CURRENCY_SYMBOLS.items() if sym in price_str), "NGN")
+        # strip non-numeric except dot and comma, then remove commas
+        only_nums = price_str.translate(_PRICE_TRANS)
+        if not only_nums.isascii():
+            only_nums = _PRICE_STRIP_RE.sub("", only_nums)
+        only_nums = only_nums.replace(",", "")
+        try:
+            return float(only_nums) if only_nums else None, currency
+        except Exception:
+            return None, currency
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        # keep specs as json string for CSV compatibility
+        d["specs"] = json.dumps(d.get("specs") or {}, ensure_ascii=False)
+        return d
+
+    def to_row(self) -> List[Any]:
+        """Field values in CSV column order (see CSV_FIELDS)."""
+        row = [getattr(self, name) for name in CSV_FIELDS]
+        row[_SPECS_COL] = json.dumps(self.specs or {}, ensure_ascii=False)
+        row[_IMAGES_COL] = str(self.all_image_urls)
+        return row
+
+# CSV column order: the ScrapedItem fields as declared
+CSV_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(ScrapedItem))
+_SPECS_COL = CSV_FIELDS.index("specs")
+_IMAGES_COL = CSV_FIELDS.index("all_image_urls")
+
+# --------------- Site configuration ----------------
+@dataclass
+class SiteConfig:
+    name: str
+    start_urls: List[str]
+    list_selector: str
+    selectors: Dict[str, str]             # selectors relative to list item
+    requires_js: bool = False
+    max_pages: int = 2
+    delay_range: Tuple[float, float] = (1.5, 3.5)
+    concurrent_requests: int = 3
+    rate_limit_per_minute: int = 30       # tokens
+    force_close: bool = False             # no keep-alive for hosts that stall on reused connections
+    # CSS selectors compiled once to lxml XPath evaluators (see __post_init__)
+    compiled_list_selector: Optional[CSSSelector] = field(default=None, init=False, repr=False)
+    compiled_selectors: Dict[str, CSSSelector] = field(default_factory=dict, init=False, repr=False)
+    # extract(list_item_element, base_url) -> ScrapedItem, specialized for this site
+    extract: Optional[Callable[[etree._Element, str], "ScrapedItem"]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        # Translating CSS -> XPath is costly; do it once per site instead of
+        # once per list item and selector
+        self.compiled_list_selector = CSSSelector(self.list_selector)
+        self.compiled_selectors = {k: CSSSelector(v) for k, v in self.selectors.items() if v}
+        self.extract = _make_list_extractor(self.name, self.compiled_selectors)
+
+
+def _no_match(el: etree._Element) -> list:
+    return []
+
+
+def _make_list_extractor(site_name: str, selectors: Dict[str, CSSSelector]) -> Callable[[etree._Element, str], ScrapedItem]:
+    """Build the list-item extractor for one site. The selectors are bound
+    once here, so the per-item function has no key lookups or None checks;
+    a missing selector simply never matches."""
+    name_sel = selectors.get("name", _no_match)
+    price_sel = selectors.get("price", _no_match)
+    url_sel = selectors.get("product_url", _no_match)
+    img_sel = selectors.get("image", _no_match)
+
+    def extract(item_el: etree._Element, base_url: str) -> ScrapedItem:
+        found = name_sel(item_el)
+        name = "".join(t.strip() for t in _TEXT_NODES_XP(found[0])) if found else None
+        found = price_sel(item_el)
+        price_raw = "".join(t.strip() for t in _TEXT_NODES_XP(found[0])) if found else None
+
+        found = url_sel(item_el)
+        product_rel = found[0].get("href") if found else None
+        product_url = None
+        if product_rel:
+            # resolved against the list page the way a browser would
+            product_url = urljoin(base_url, product_rel)
+
+        found = img_sel(item_el)
+        image = (found[0].get("src") or found[0].get("data-src")) if found else None
+        if image and image.startswith("//"):
+            image = "https:" + image
+
+        return ScrapedItem(
+            name=name,
+            price_raw=price_raw,
+            product_url=product_url,
+            image_url=image or None,
+            source_site=site_name
+        )
+
+    return extract
+
+# --------------- Rate limiter ----------------
+class RateLimiter:
+    """Token bucket: holds up to `rate_per_minute` tokens and refills
+    continuously at rate_per_minute / 60 tokens per second."""
+    def __init__(self, rate_per_minute: int):
+        self.tokens = float(rate_per_minute)
+        self.max_tokens = float(rate_per_minute)
+        self.refill_period = 60.0
+        self.refill_rate = self.max_tokens / self.refill_period   # tokens per second
+        self.last_refill = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.max_tokens, self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            # sleep exactly until the next whole token is available
+            await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+
+# --------------- Concurrency limiter ----------------
+class DynamicLimiter:
+    """Bounds concurrent tasks like a semaphore, but the limit can be changed
+    at runtime (e.g. lowered when a site starts returning 429s)."""
+    def __init__(self, limit: int):
+        self._limit = max(1, limit)
+        self._active = 0
+        self._cv = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    async def set_limit(self, limit: int):
+        async with self._cv:
+            self._limit = max(1, limit)
+            # waiters re-check against the new limit
+            self._cv.notify_all()
+
+    async def acquire(self):
+        async with self._cv:
+            await self._cv.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+
+    async def release(self):
+        async with self._cv:
+            self._active -= 1
+            self._cv.notify()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+# --------------- Playwright context pool ----------------
+class BrowserContextPool:
+    """Up to `size` browser contexts shared by a site's fetches. Contexts are
+    created lazily and replaced after `max_navigations` uses, which bounds the
+    memory a long-lived context accumulates."""
+    def __init__(self, browser, size: int, context_kwargs: Callable[[], Dict[str, Any]],
+                 max_navigations: int = 20, block_resources: bool = True):
+        self.browser = browser
+        self.max_navigations = max_navigations
+        self.block_resources = block_resources
+        self._context_kwargs = context_kwargs
+        # each slot is [context or None, navigations served]
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for _ in range(max(1, size)):
+            self._slots.put_nowait([None, 0])
+        self._closed = False
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[Any]:
+        slot = await self._slots.get()
+        try:
+            if slot[0] is None or slot[1] >= self.max_navigations:
+                await self._close_context(slot[0])
+                slot[0] = await self.browser.new_context(**self._context_kwargs())
+                if self.block_resources:
+                    await slot[0].route("**/*", _block_unneeded_requests)
+                slot[1] = 0
+            slot[1] += 1
+            yield slot[0]
+        except Exception:
+            # don't hand a possibly broken context to the next caller
+            await self._close_context(slot[0])
+            slot[0], slot[1] = None, 0
+            raise
+        finally:
+            if self._closed:
+                # close() already drained the idle slots; don't strand this one
+                await self._close_context(slot[0])
+            else:
+                self._slots.put_nowait(slot)
+
+    async def close(self):
+        self._closed = True
+        while not self._slots.empty():
+            slot = self._slots.get_nowait()
+            await self._close_context(slot[0])
+
+    @staticmethod
+    async def _close_context(context):
+        if context is None:
+            return
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+# --------------- Streaming CSV output ----------------
+class CsvStreamWriter:
+    """Appends items to a CSV file as they are produced. Producers put items
+    on a bounded queue (backpressure); a single consumer task formats and
+    writes them, so rows never interleave and finished items are on disk even
+    if the crawl fails part-way. If a write fails, the consumer keeps draining
+    the queue (so producers never block on it) and the error is re-raised by
+    the next put() and by close()."""
+    def __init__(self, path: Path, maxsize: int = 16):
+        self.path = path
+        self.rows_written = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._file = None
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def start(self):
+        self._file = await aiofiles.open(self.path, "w", encoding="utf-8", newline="")
+        await self._file.write(self._format(CSV_FIELDS))
+        self._task = asyncio.create_task(self._consume())
+
+    async def put(self, item: ScrapedItem):
+        self._raise_if_failed()
+        await self._queue.put(item)
+
+    async def close(self):
+        try:
+            if self._task:
+                if not self._task.done():
+                    await self._queue.put(None)  # sentinel: drain, then stop
+                await self._task
+                self._task = None
+        finally:
+            if self._file:
+                await self._file.close()
+                self._file = None
+        self._raise_if_failed()
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise RuntimeError(f"CSV writer for {self.path} failed") from self._error
+
+    async def _consume(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue  # keep draining so producers and close() never block
+            try:
+                await self._file.write(self._format(item.to_row()))
+                self.rows_written += 1
+            except Exception as e:
+                logger.error(f"Failed writing to {self.path}: {e}")
+                self._error = e
+
+    @staticmethod
+    def _format(row) -> str:
+        buf = io.StringIO()
+        csv.writer(buf).writerow(row)
+        return buf.getvalue()
+
+# --------------- Scraper class ----------------
+class NigeriaSolarScraper:
+    # Static part of the per-request headers; Accept-Language is set on the client
+    BASE_HEADERS = {"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"}
+    # Number of User-Agent strings drawn from fake-useragent at startup
+    UA_POOL_SIZE = 32
+
+    def __init__(self, output_dir: str = "./scraped_data"):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.ua = UserAgent()
+        # Sample the UAs once; picking from a small tuple is far cheaper than
+        # querying fake-useragent's database on every request
+        self._ua_pool = tuple(self.ua.random for _ in range(self.UA_POOL_SIZE))
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        self.limiters: Dict[str, DynamicLimiter] = {}
+        # One HTTP client (and connection pool) is shared by every site for
+        # the whole run; it is created lazily and closed by aclose() / the
+        # async context manager
+        self.client: Optional[httpx.AsyncClient] = None
+        # Separate keep-alive-free client for sites with force_close=True
+        self.closing_client: Optional[httpx.AsyncClient] = None
+        # Normalized product URLs seen anywhere in this crawl (all sites), so
+        # duplicates are dropped before their detail pages are fetched
+        self.seen = BloomFilter(capacity=100_000, error_rate=0.001) if BLOOM_AVAILABLE else set()
+        # One Chromium instance for the whole run, launched on first JS site
+        self.playwright = None
+        self.browser = None
+        # Sites run concurrently; only the first JS site may launch the browser
+        self._browser_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "NigeriaSolarScraper":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        for client in (self.client, self.closing_client):
+            if client:
+                try:
+                    await client.aclose()
+                except Exception:
+                    pass
+        self.client = None
+        self.closing_client = None
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = None
+
+    def _get_client(self, force_close: bool = False) -> httpx.AsyncClient:
+        if force_close:
+            if not self.closing_client or self.closing_client.is_closed:
+                # HTTP/1.1 with no pooled connections: every request closes its socket
+                self.closing_client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_keepalive_connections=0, max_connections=50),
+                    timeout=30.0,
+                    follow_redirects=True,
+                    headers={"Accept-Language": "en-US,en;q=0.5"}
+                )
+            return self.closing_client
+        if not self.client or self.client.is_closed:
+            # Short keep-alive expiry so idle connections to slow fronts are
+            # dropped instead of being reused after the server has stalled them
+            self.client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=15.0),
+                timeout=30.0,
+                follow_redirects=True,
+                headers={"Accept-Language": "en-US,en;q=0.5"}
+            )
+        return self.client
+
+    def _headers(self):
+        # User-Agent rotates per request
+        return {**self.BASE_HEADERS, "User-Agent": random.choice(self._ua_pool)}
+
+    async def _fetch_static(self, url: str, force_close: bool = False, as_bytes: bool = False):
+        """Fetch a page over HTTP. Returns the decoded text, or a (raw body
+        bytes, response encoding) pair when `as_bytes` is set; None on any failure."""
+        client = self._get_client(force_close)
+        try:
+            resp = await client.get(url, headers=self._headers())
+            if resp.status_code != 200:
+                logger.warning(f"Non-200 {resp.status_code} for {url}")
+                return None
+            return (resp.content, resp.encoding) if as_bytes else resp.text
+        except Exception as e:
+            logger.error(f"Static fetch error for {url}: {e}")
+            return None
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if not self.browser:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(headless=True)
+                logger.info("Playwright launched")
+        return self.browser
+
+    def _context_kwargs(self) -> Dict[str, Any]:
+        return {"user_agent": random.choice(self._ua_pool), "viewport": {"width": 1280, "height": 800}}
+
+    async def _fetch_playwright(self, pool: BrowserContextPool, url: str) -> Optional[str]:
+        try:
+            async with pool.context() as context:
+                page = await context.new_page()
+                try:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=45000)
+                    try:
+                        # wait for dynamic loads to settle instead of a fixed sleep
+                        await page.wait_for_load_state("networkidle", timeout=3000)
+                    except PlaywrightTimeoutError:
+                        pass  # page keeps polling; use what has rendered so far
+                    return await page.content()
+                finally:
+                    await page.close()
+        except Exception as e:
+            logger.error(f"Playwright fetch error for {url}: {e}")
+            return None
+
+    def _parse_html_tree(self, content: str) -> Optional[etree._Element]:
+        try:
+            try:
+                return lxml_html.fromstring(content)
+            except ValueError:
+                # str input with an XML encoding declaration must be parsed as bytes
+                return lxml_html.fromstring(content.encode("utf-8"))
+        except etree.ParserError as e:
+            logger.warning(f"Could not parse HTML: {e}")
+            return None
+
+    def _parse_product_detail(self, content: bytes, base_url: str, item: ScrapedItem, encoding: str = "utf-8") -> ScrapedItem:
+        tree = _parse_detail_tree(content, encoding)
+        if tree is None:
+            return item
+        # description
+        description = _extract_description(tree)
+        if description is not None:
+            item.description = description
+        # images
+        imgs = _extract_images(tree)
+        item.all_image_urls = imgs[:10]
+        if not item.image_url and imgs:
+            item.image_url = imgs[0]
+        # specs: tables, then "key: value" lists (<table class="specs">,
+        # <ul class="specs">, ...), then heuristics over the free text
+        specs = _extract_specs_from_tables(tree)
+        specs.update(_extract_specs_from_lists(tree))
+        text_blob = (item.description or "") + " " + _extract_paragraph_text(tree)
+        specs.update(_extract_specs_from_text(text_blob, specs))
+        # brand/model heuristics from title
+        if item.name:
+            bm = _NAME_SPLIT_RE.split(item.name)
+            if len(bm) >= 2:
+                item.brand = bm[0].strip()
+                item.model = bm[1].strip() if len(bm) > 1 else item.model
+        item.specs.update(specs)
+        return item
+
+    async def _save_item_html(self, html: bytes, site_name: str, slug: str) -> str:
+        """Write the raw page bytes to disk, lz4-compressed when available."""
+        suffix = ".html.lz4" if LZ4_AVAILABLE else ".html"
+        fn = self.output_dir / f"{site_name}_{slug}_{int(time.time())}{suffix}"
+        try:
+            if LZ4_AVAILABLE:
+                html = lz4.frame.compress(html)
+            async with aiofiles.open(fn, "wb") as f:
+                await f.write(html)
+            return str(fn)
+        except Exception:
+            return ""
+
+    async def scrape_site(self, config: SiteConfig, search_keyword: str = None,
+                          csv_path: Optional[Path] = None) -> List[ScrapedItem]:
+        """Scrape one site's list pages and the detail page of every new item.
+
+        Args:
+            config (SiteConfig): The site to scrape.
+            search_keyword (Optional[str]): Substituted for '{q}' in the start URLs.
+            csv_path (Optional[Path]): If given, each finished item is appended to
+                                       this CSV file as soon as it completes.
+
+        Returns:
+            The deduplicated items, in the order they finished.
+        """
+        logger.info(f"Starting scrape for {config.name}")
+        # rate limiter for site
+        rl = RateLimiter(config.rate_limit_per_minute)
+        self.rate_limiters[config.name] = rl
+        items: List[ScrapedItem] = []
+
+        # optionally substitute search keywords in start_urls
+        start_urls = []
+        for u in config.start_urls:
+            if "{q}" in u:
+                start_urls.append(u.replace("{q}", (search_keyword or "solar").replace(" ", "+")))
+            else:
+                start_urls.append(u)
+
+        # Decide whether to use Playwright or static
+        pool: Optional[BrowserContextPool] = None
+
+        if config.requires_js and PLAYWRIGHT_AVAILABLE:
+            try:
+                browser = await self._get_browser()
+                pool = BrowserContextPool(browser, config.concurrent_requests, self._context_kwargs)
+            except Exception as e:
+                logger.warning(f"Playwright failed to start: {e}. Falling back to static fetches.")
+                pool = None
+
+        limiter = DynamicLimiter(config.concurrent_requests)
+        self.limiters[config.name] = limiter
+
+        async def process_list_page(url: str):
+            async with limiter:
+                await rl.acquire()
+                logger.info(f"Fetching list page: {url}")
+                content = None
+                if pool:
+                    content = await self._fetch_playwright(pool, url)
+                else:
+                    content = await self._fetch_static(url, force_close=config.force_close)
+                if not content:
+                    return
+                tree = self._parse_html_tree(content)
+                if tree is None:
+                    return
+                list_nodes = config.compiled_list_selector(tree)
+                logger.info(f"Found {len(list_nodes)} list nodes on {url}")
+                for node in list_nodes:
+                    item = config.extract(node, url)
+                    # only items with at least a name or product_url
+                    if not (item.name or item.product_url):
+                        continue
+                    if item.product_url:
+                        key = _product_url_key(item.product_url)
+                        if key in self.seen:
+                            continue
+                        self.seen.add(key)
+                    items.append(item)
+
+        # fetch list pages (concurrently but limited)
+        tasks = []
+        for url in start_urls[: config.max_pages]:
+            tasks.append(asyncio.create_task(process_list_page(url)))
+            await asyncio.sleep(random.uniform(*config.delay_range))
+        await asyncio.gather(*tasks)
+
+        # items are emitted (deduplicated by product_url or name+price, and
+        # streamed to csv_path) as soon as their detail page is done
+        writer: Optional[CsvStreamWriter] = None
+        if csv_path:
+            writer = CsvStreamWriter(csv_path, maxsize=config.concurrent_requests * 4)
+            await writer.start()
+        unique = set()
+        final_items: List[ScrapedItem] = []
+
+        async def emit(item: ScrapedItem):
+            key = item.product_url or f"{item.name}_{item.price_cleaned}"
+            if key in unique:
+                return
+            unique.add(key)
+            final_items.append(item)
+            if writer:
+                await writer.put(item)
+
+        # visit detail pages for richer info
+        async def process_detail(item: ScrapedItem):
+            async with limiter:
+                await rl.acquire()
+                logger.info(f"Visiting detail: {item.product_url}")
+                content_bytes = None
+                # Playwright returns text, which we encode as UTF-8 ourselves;
+                # static pages are parsed in the charset their response declared
+                encoding = "utf-8"
+                if pool:
+                    content = await self._fetch_playwright(pool, item.product_url)
+                    if content:
+                        content_bytes = content.encode("utf-8")
+                else:
+                    fetched = await self._fetch_static(item.product_url, force_close=config.force_close, as_bytes=True)
+                    if fetched:
+                        content_bytes, encoding = fetched
+                if not content_bytes:
+                    logger.warning(f"No content for detail: {item.product_url}")
+                    return
+                # save the raw bytes, then parse the same bytes (no decoded copy)
+                slug = _SLUG_RE.sub("_", (item.name or "product"))[:40]
+                raw_path = await self._save_item_html(content_bytes, config.name, slug)
+                if raw_path:
+                    item.raw_html_path = raw_path
+                # parse detail
+                self._parse_product_detail(content_bytes, base_url=item.product_url, item=item, encoding=encoding)
+                await asyncio.sleep(random.uniform(0.5, 1.7))
+
+        async def process_item(item: ScrapedItem):
+            if item.product_url:
+                await process_detail(item)
+            await emit(item)
+
+        # concurrency is bounded by the limiter, so all detail tasks are
+        # scheduled at once and each starts as soon as a slot frees up
+        item_tasks = [asyncio.create_task(process_item(it)) for it in items]
+        results = []
+        try:
+            # one failed item doesn't stop the others; its error is raised below
+            results = await asyncio.gather(*item_tasks, return_exceptions=True)
+        finally:
+            # if we were cancelled, stop the item tasks before closing the
+            # contexts and writer they use
+            for task in item_tasks:
+                task.cancel()
+            await asyncio.gather(*item_tasks, return_exceptions=True)
+            # release this site's contexts; the browser stays up for the other sites
+            if pool:
+                await pool.close()
+            # flush whatever finished, even if the crawl failed part-way
+            if writer:
+                await writer.close()
+                logger.info(f"Saved {writer.rows_written} items to {csv_path}")
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        logger.info(f"Scraping finished for {config.name}. Items collected: {len(final_items)}")
+        return final_items
+
+    def _csv_path(self, site_name: str) -> Path:
+        return self.output_dir / f"{site_name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    async def save_to_csv(self, items: List[ScrapedItem], site_name: str) -> str:
+        if not items:
+            logger.warning("No items to save")
+            return ""
+        fn = self._csv_path(site_name)
+        writer = CsvStreamWriter(fn)
+        await writer.start()
+        try:
+            for it in items:
+                await writer.put(it)
+        finally:
+            await writer.close()
+        logger.info(f"Saved {len(items)} items to {fn}")
+        return str(fn)
+
+
+# --------------- Site configs (Jumia, Konga, Jiji) ---------------
+def get_default_configs() -> List[SiteConfig]:
+    return [
+        SiteConfig(
+            name="jumia",
+            start_urls=[
+                "https://www.jumia.com.ng/catalog/?q=solar+battery/",
+                "https://www.jumia.com.ng/catalog/?q=solar+panel/",
+                "https://www.jumia.com.ng/catalog/?q=solar+inverter/"
+            ],
+            list_selector="article.prd",
+            selectors={
+                "name": ".info .name, .name",
+                "price": ".prc, .price",
+                "product_url": "a.core, a[href]",
+                "image": ".img img"
+            },
+            requires_js=False,
+            max_pages=3,
+            delay_range=(1.0, 2.5),
+            concurrent_requests=3,
+            rate_limit_per_minute=100
+        ),
+        SiteConfig(
+            name="konga",
+            start_urls=[
+                "https://www.konga.com/search?search={q}"
+            ],
+            list_selector=".product",
+            selectors={
+                "name": ".name, .product-title",
+                "price": ".price, .sale-price",
+                "product_url": "a",
+                "image": "img"
+            },
+            requires_js=True,
+            max_pages=2,
+            delay_range=(2.5, 4.0),
+            concurrent_requests=2,
+            rate_limit_per_minute=30
+        ),
+        SiteConfig(
+            name="jiji",
+            start_urls=[
+                "https://jiji.ng/search?query={q}",
+                "https://jiji.ng/solar-panels"
+            ],
+            list_selector=".qa-advert-list-item, [data-cy='ad-card']",
+            selectors={
+                "name": ".qa-advert-list-title, [data-cy='ad-title']",
+                "price": ".qa-advert-price, [data-cy='ad-price']",
+                "product_url": "a[href*='/ad/']",
+                "image": ".qa-advert-list-photo img"
+            },
+            requires_js=True,
+            max_pages=2,
+            delay_range=(3.0, 5.0),
+            concurrent_requests=2,
+            rate_limit_per_minute=25
+        )
+    ]
+
+# --------------- CLI / main ----------------
+async def main():
+    print("Nigeria Solar Scraper")
     print("Running full scrape for Jumia, Konga, Jiji")
     ch = "2"
-
-    scraper = NigeriaSolarScraper(output_dir="./scraped_data")
-    configs = get_default_configs()
-
-    if ch == "1":
-        conf = configs[0]  # jumia quick
-        items = await scraper.scrape_site(conf, search_keyword="solar panel")
-        await scraper.save_to_csv(items, conf.name)
-    elif ch == "2":
-        all_results = {}
-        for conf in configs:
-            items = await scraper.scrape_site(conf, search_keyword="solar panel")
-            out = await scraper.save_to_csv(items, conf.name)
-            all_results[conf.name] = {"count": len(items), "file": out}
-            # polite gap between sites
-            await asyncio.sleep(2.0)
-        print(json.dumps(all_results, indent=2))
-    elif ch == "3":
-        conf = configs[0]
-        items = await scraper.scrape_site(conf, search_keyword="solar panel")
-        await scraper.save_to_csv(items, conf.name)
-    else:
-        print("Invalid choice.")
-
-if __name__ == "__main__":
-    # handle running inside Jupyter/Colab where an event loop may already be active.
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # running inside notebook — create task
-            loop.create_task(main())
-            # give time for task to run (user can await in notebook)
-        else:
-            asyncio.run(main())
-    except RuntimeError:
-        # fallback
+
+    configs = get_default_configs()
+
+    # A single scraper (and HTTP client) serves every site; the client is
+    # closed when the block exits
+    async with NigeriaSolarScraper(output_dir="./scraped_data") as scraper:
+        # Items are streamed to each site's CSV as they finish
+        if ch == "1":
+            conf = configs[0]  # jumia quick
+            await scraper.scrape_site(conf, search_keyword="solar panel", csv_path=scraper._csv_path(conf.name))
+        elif ch == "2":
+            # Sites share nothing but the client and browser, and each has its
+            # own rate limiter, so they are scraped concurrently
+            paths = [scraper._csv_path(conf.name) for conf in configs]
+            results = await asyncio.gather(
+                *(scraper.scrape_site(conf, search_keyword="solar panel", csv_path=path)
+                  for conf, path in zip(configs, paths))
+            )
+            all_results = {}
+            for conf, path, items in zip(configs, paths, results):
+                all_results[conf.name] = {"count": len(items), "file": str(path)}
+            print(json.dumps(all_results, indent=2))
+        elif ch == "3":
+            conf = configs[0]
+            await scraper.scrape_site(conf, search_keyword="solar panel", csv_path=scraper._csv_path(conf.name))
+        else:
+            print("Invalid choice.")
+
+if __name__ == "__main__":
+    # use uvloop's faster event loop where available (never on Windows)
+    if UVLOOP_AVAILABLE and os.name != "nt":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    # handle running inside Jupyter/Colab where an event loop may already be active.
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_running():
+            # running inside notebook — create task
+            loop.create_task(main())
+            # give time for task to run (user can await in notebook)
+        else:
+            asyncio.run(main())
+    except RuntimeError:
+        # fallback
         asyncio.run(main())
\ No newline at end of file
@@ -1,119 +1,409 @@
-import pandas as pd
-import numpy as np
+from __future__ import annotations
+
+import os
+import functools
+import importlib
+import importlib.util
+import json
 import logging
-from typing import Optional, Dict, Any
+import weakref
+from typing import TYPE_CHECKING, Optional, Dict, Any, NamedTuple, Tuple
 
-# Assuming watt_calculation.py is in the same directory
-from watt_calculation import calculate_required_wattage
+# pandas and NumPy are imported inside the functions that use them, so importing
+# this module (e.g. for calculate_required_wattage) doesn't pay their start-up cost.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Assuming watt_calculation.py is in the same directory
+from watt_calculation import calculate_required_wattage, calculate_required_wattage_batch
+
+# Module logger; handlers and levels are configured by the entry point
+logger = logging.getLogger(__name__)
+
+# Optional numba: JIT-compiles the batch sizing kernel to a parallel native loop.
+# Only probed here; it is imported (and the kernel compiled) on first batch use.
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+# Optional orjson: serializes the demo output in C, NumPy scalars included
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional pyarrow: writes batch sizing results as columnar Parquet. Probed only,
+# like numba, since pyarrow is slow to import and only needed when saving.
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Component DataFrames that load_and_prepare_data provides and sizing requires
+REQUIRED_COMPONENT_KEYS = frozenset({'panels', 'inverters', 'batteries'})
+
+# The only columns sizing and cost estimation read; everything else in the
+# cleaned dataset is skipped when loading it.
+CATALOG_COLUMNS = [
+    'Panel_Brand', 'Panel_Model', 'Panel_Wattage_W',
+    'Inverter_Brand', 'Inverter_Model', 'Inverter_Rating_kW', 'Inverter_Efficiency_%',
+    'Battery_Brand', 'Battery_Model', 'Battery_Capacity_kWh_Usable',
+    'Component_Price_NGN'
+]
+
+# Low-cardinality identifier columns held as `category`, and the rating
+# columns that are downcast to 32-bit types where that loses no precision.
+_CATEGORY_COLUMNS = [
+    'Panel_Brand', 'Panel_Model', 'Inverter_Brand', 'Inverter_Model',
+    'Battery_Brand', 'Battery_Model'
+]
+_RATING_COLUMNS = [
+    'Panel_Wattage_W', 'Inverter_Rating_kW', 'Battery_Capacity_kWh_Usable',
+    'Inverter_Efficiency_%'
+]
+
+class SortedInverters(NamedTuple):
+    """The inverter catalog in ascending rating order, held as plain arrays."""
+    ratings: np.ndarray            # Ratings in kW (float64), ascending
+    fields: Dict[str, np.ndarray]  # Recommendation key -> that column's values, in rating order
+    top: int                       # Position of the first inverter with the top rating
+
+# Inverter recommendation fields: (output key, catalog column, value if the column is absent)
+_INVERTER_FIELDS = (
+    ("inverter_brand", 'Inverter_Brand', 'N/A'),
+    ("inverter_model", 'Inverter_Model', 'N/A'),
+    ("inverter_rating_kw", 'Inverter_Rating_kW', None),
+    ("inverter_efficiency", 'Inverter_Efficiency_%', None)
+)
+
+# Rating-sorted inverter catalogs, keyed by id() of the frame they were built from.
+# Each entry holds a weak reference to that frame, so a recycled id is detected,
+# and is evicted when the frame is garbage collected.
+_SORTED_INVERTERS: Dict[int, Tuple[weakref.ref, SortedInverters]] = {}
+
+_LAZY_MODULES = {'pd': 'pandas', 'np': 'numpy'}
+
+def __getattr__(name: str) -> Any:
+    """Resolves `system_sizing.pd` / `system_sizing.np` on first access."""
+    if name in _LAZY_MODULES:
+        module = importlib.import_module(_LAZY_MODULES[name])
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def resolve_data_filepath(filepath: str) -> str:
+    """
+    Returns the Parquet sibling of `filepath` (same name, '.parquet' extension) if it
+    exists and is at least as new as `filepath`, otherwise `filepath` itself. Parquet
+    is typed and columnar, so it loads much faster than re-parsing the CSV; a stale
+    one (e.g. left behind when only the CSV was rewritten) is ignored.
+    """
+    parquet_filepath = os.path.splitext(filepath)[0] + '.parquet'
+    if parquet_filepath == filepath:
+        return filepath
+    try:
+        parquet_mtime_ns = os.stat(parquet_filepath).st_mtime_ns
+    except FileNotFoundError:
+        return filepath
+    try:
+        if os.stat(filepath).st_mtime_ns > parquet_mtime_ns:
+            return filepath
+    except FileNotFoundError:
+        pass
+    return parquet_filepath
 
-def load_and_prepare_data(filepath: str) -> Dict[str, pd.DataFrame]:
+def load_and_prepare_data(filepath: str) -> Dict[str, Any]:
     """
     Loads the cleaned data and prepares separate DataFrames for major components.
 
     Args:
-        filepath (str): The path to the cleaned data CSV file.
+        filepath (str): The path to the cleaned data CSV file. A Parquet file with the
+                        same name is used instead when present.
 
     Returns:
-        A dictionary containing separate DataFrames for panels, inverters, and batteries.
+        A dictionary containing separate DataFrames for panels, inverters, and batteries,
+        plus a 'prices' entry mapping each component model to its price in NGN and a
+        'lookups' entry with each recommender's precomputed choice data.
+
+    Results are cached per (filepath, modification time), so repeated calls within
+    a process skip the CSV parse until the file changes on disk. Each call gets
+    shallow copies of the cached DataFrames, so adding or replacing columns on them
+    does not affect later calls.
     """
+    import pandas as pd
+
+    filepath = resolve_data_filepath(filepath)
     try:
-        df = pd.read_csv(filepath)
-        logging.info(f"Successfully loaded component data from '{filepath}'.")
+        mtime_ns = os.stat(filepath).st_mtime_ns
     except FileNotFoundError:
-        logging.error(f"Component data file not found at '{filepath}'.")
+        logger.error("Component data file not found at '%s'.", filepath)
         return {}
 
+    # Return a fresh top-level dict and shallow DataFrame copies (no data is
+    # copied) so callers can't alter the cached entry.
+    return {
+        key: value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+        for key, value in _load_and_prepare_cached(filepath, mtime_ns).items()
+    }
+
+def _downcast_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks the catalog's dtypes so the dedupe, mode and mask scans touch fewer bytes.
+
+    Brand/model strings become `category` (integer codes over a small set of
+    labels). Integer ratings are downcast to the smallest integer type that
+    holds them; float ratings only become float32 when every value survives
+    the round trip, so recommendations report exactly the catalog's values.
+
+    Args:
+        df (pd.DataFrame): The catalog as read from disk.
+
+    Returns:
+        pd.DataFrame: The same frame with downcast columns.
+    """
+    import numpy as np
+    import pandas as pd
+
+    for col in _RATING_COLUMNS:
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'iu':
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif values.dtype == np.float64:
+            as_float32 = values.astype(np.float32)
+            if np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+                df[col] = as_float32
+    for col in _CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+    return df
+
+@functools.lru_cache(maxsize=8)
+def _load_and_prepare_cached(filepath: str, mtime_ns: int) -> Dict[str, Any]:
+    """Cached worker for load_and_prepare_data; `mtime_ns` is only part of the cache key."""
+    import pandas as pd
+
+    # Project to the catalog columns on read: Parquet skips the other column
+    # chunks entirely, and the CSV parser only converts the fields we keep.
+    if filepath.endswith('.parquet'):
+        df = pd.read_parquet(filepath, columns=CATALOG_COLUMNS)
+    else:
+        df = pd.read_csv(filepath, usecols=CATALOG_COLUMNS)
+    logger.info("Successfully loaded component data from '%s'.", filepath)
+    df = _downcast_catalog(df)
+
     # For simplicity, we drop duplicates based on model numbers for each category
-    # to get a cleaner list of available components.
-    panels_df = df.dropna(subset=['Panel_Model', 'Panel_Wattage_W']).drop_duplicates(subset=['Panel_Model'])
-    inverters_df = df.dropna(subset=['Inverter_Model', 'Inverter_Rating_kW']).drop_duplicates(subset=['Inverter_Model'])
-    batteries_df = df.dropna(subset=['Battery_Model', 'Battery_Capacity_kWh_Usable']).drop_duplicates(subset=['Battery_Model'])
+    # to get a cleaner list of available components. Each frame is selected with
+    # one fused mask and narrowed to the columns its recommender and price lookup use.
+    price_col = 'Component_Price_NGN'
+    panels_df = df.loc[
+        _first_valid_mask(df, 'Panel_Model', 'Panel_Wattage_W'),
+        ['Panel_Brand', 'Panel_Model', 'Panel_Wattage_W', price_col]
+    ]
+    inverters_df = df.loc[
+        _first_valid_mask(df, 'Inverter_Model', 'Inverter_Rating_kW'),
+        ['Inverter_Brand', 'Inverter_Model', 'Inverter_Rating_kW', 'Inverter_Efficiency_%', price_col]
+    ]
+    batteries_df = df.loc[
+        _first_valid_mask(df, 'Battery_Model', 'Battery_Capacity_kWh_Usable'),
+        ['Battery_Brand', 'Battery_Model', 'Battery_Capacity_kWh_Usable', price_col]
+    ]
+
+    # Build model -> price lookups once so cost estimation is a dict access
+    # instead of a boolean-mask scan over each DataFrame.
+    prices = {
+        "panels": dict(zip(panels_df['Panel_Model'], panels_df[price_col])),
+        "inverters": dict(zip(inverters_df['Inverter_Model'], inverters_df[price_col])),
+        "batteries": dict(zip(batteries_df['Battery_Model'], batteries_df[price_col]))
+    }
+
+    # Precompute what the recommenders would otherwise derive from the frames on
+    # every call: the chosen panel/battery (most common size and its first row, as
+    # a plain dict) and the inverters sorted by rating for a binary search.
+    lookups = {
+        "panels": _mode_choice(panels_df, 'Panel_Wattage_W'),
+        "inverters": _sorted_inverters(inverters_df),
+        "batteries": _mode_choice(batteries_df, 'Battery_Capacity_kWh_Usable')
+    }
 
     return {
         "panels": panels_df,
         "inverters": inverters_df,
-        "batteries": batteries_df
+        "batteries": batteries_df,
+        "prices": prices,
+        "lookups": lookups
     }
 
-def recommend_panels(required_wattage: float, panel_df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+def _first_valid_mask(df: pd.DataFrame, model_col: str, value_col: str) -> np.ndarray:
+    """
+    Returns a boolean mask of the rows that `dropna(subset=[model_col, value_col])`
+    followed by `drop_duplicates(subset=[model_col])` would keep.
+
+    Works on the model column's integer category codes (-1 marks a missing model).
+    Rows failing the NaN check are mapped to -1 before the first occurrence of each
+    code is located, so a model whose first row is incomplete still keeps its first
+    complete row, exactly as with the two-step chain.
+    """
+    import numpy as np
+
+    codes = df[model_col].cat.codes.to_numpy()
+    valid = (codes >= 0) & df[value_col].notna().to_numpy()
+    _, first = np.unique(np.where(valid, codes, -1), return_index=True)
+    mask = np.zeros(len(codes), dtype=bool)
+    mask[first] = True
+    return mask & valid
+
+def _mode_choice(df: pd.DataFrame, col: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """
+    Returns the most common value of `col` (the smallest one on ties) and the first row
+    holding it as a column -> value dict, or None if the frame is empty. NumPy scalars
+    are returned as Python ints/floats, so the catalog's narrow (e.g. int16) dtypes
+    don't leak into recommendations, where arithmetic on them could overflow.
+    """
+    import numpy as np
+
+    if df.empty:
+        return None
+    target = df[col].mode()[0]
+    row = df.iloc[int(np.argmax(df[col].to_numpy() == target))].to_dict()
+    return target.item(), {key: value.item() if isinstance(value, np.generic) else value for key, value in row.items()}
+
+def _sorted_inverters(df: pd.DataFrame) -> SortedInverters:
+    """
+    Sorts the inverter catalog by rating and extracts the recommendation fields as
+    arrays, so choosing an inverter is a binary search plus array indexing. The sort
+    is stable, so equal ratings keep their frame order.
+    """
+    import numpy as np
+
+    ratings = df['Inverter_Rating_kW'].to_numpy(dtype=np.float64)
+    order = np.argsort(ratings, kind='stable')
+    ratings = ratings[order]
+    top = int(np.searchsorted(ratings, ratings[-1], side='left')) if len(ratings) else 0
+    # Numeric fields are widened back to 64-bit, so recommendations don't carry the
+    # catalog's downcast dtypes
+    fields = {}
+    for key, col, _ in _INVERTER_FIELDS:
+        if col in df:
+            values = df[col].to_numpy()[order]
+            if values.dtype.kind in 'iu':
+                values = values.astype(np.int64)
+            elif values.dtype.kind == 'f':
+                values = values.astype(np.float64)
+            fields[key] = values
+    return SortedInverters(ratings, fields, top)
+
+def _cached_sorted_inverters(df: pd.DataFrame) -> SortedInverters:
+    """
+    _sorted_inverters(df), memoized per frame object so repeated calls with the same
+    inverter frame sort it only once. Frames are assumed not to be mutated after
+    their first lookup.
+    """
+    key = id(df)
+    entry = _SORTED_INVERTERS.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    sorted_inverters = _sorted_inverters(df)
+    _SORTED_INVERTERS[key] = (weakref.ref(df, lambda _, key=key: _SORTED_INVERTERS.pop(key, None)), sorted_inverters)
+    return sorted_inverters
+
+def recommend_panels(
+    required_wattage: float,
+    panel_df: pd.DataFrame,
+    choice: Optional[Tuple[Any, Dict[str, Any]]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Recommends a solar panel configuration to meet the required wattage.
 
     Args:
         required_wattage (float): The total required wattage from the solar array.
         panel_df (pd.DataFrame): DataFrame of available solar panels.
+        choice (Optional[Tuple]): The precomputed (wattage, row dict) of the panel to use,
+                                  from load_and_prepare_data's 'lookups'.
 
     Returns:
         A dictionary with the recommended panel details, or None if no suitable panel is found.
     """
     if panel_df.empty:
-        logging.warning("Panel DataFrame is empty. Cannot recommend panels.")
+        logger.warning("Panel DataFrame is empty. Cannot recommend panels.")
         return None
 
     # Strategy: Select the most common panel wattage available in the dataset.
     # This represents a "typical" panel a user might buy.
-    try:
-        target_panel_wattage = panel_df['Panel_Wattage_W'].mode()[0]
-    except KeyError:
-        logging.error("Column 'Panel_Wattage_W' not found in panel data.")
-        return None
-
-    selected_panel = panel_df[panel_df['Panel_Wattage_W'] == target_panel_wattage].iloc[0]
-
-    number_of_panels = np.ceil(required_wattage / target_panel_wattage)
+    if choice is None:
+        try:
+            choice = _mode_choice(panel_df, 'Panel_Wattage_W')
+        except KeyError:
+            logger.error("Column 'Panel_Wattage_W' not found in panel data.")
+            return None
+    target_panel_wattage, selected_panel = choice
+
+    # Ceiling division on whole milliwatts, -(-a // b), in Python ints: exact, so a
+    # requirement that is an exact multiple of the panel size (up to float noise)
+    # doesn't pick up a spurious extra panel, and a downcast (int32/float32) catalog
+    # value can't overflow.
+    number_of_panels = -(-round(required_wattage * 1000) // round(float(target_panel_wattage) * 1000))
 
     recommendation = {
         "panel_brand": selected_panel.get('Panel_Brand', 'N/A'),
         "panel_model": selected_panel.get('Panel_Model', 'N/A'),
         "individual_panel_wattage": target_panel_wattage,
-        "number_of_panels": int(number_of_panels),
-        "total_panel_wattage": int(number_of_panels * target_panel_wattage)
+        "number_of_panels": number_of_panels,
+        "total_panel_wattage": int(number_of_panels * float(target_panel_wattage))
     }
-    logging.info(f"Panel recommendation: {recommendation['number_of_panels']} x {recommendation['individual_panel_wattage']}W panels.")
+    logger.info("Panel recommendation: %s x %sW panels.", number_of_panels, target_panel_wattage)
     return recommendation
 
-def recommend_inverter(required_wattage: float, inverter_df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+def recommend_inverter(
+    required_wattage: float,
+    inverter_df: pd.DataFrame,
+    sorted_inverters: Optional[SortedInverters] = None
+) -> Optional[Dict[str, Any]]:
     """
     Recommends an inverter that can handle the solar array's power.
 
     Args:
         required_wattage (float): The total wattage of the solar array.
         inverter_df (pd.DataFrame): DataFrame of available inverters.
+        sorted_inverters (Optional[SortedInverters]): The precomputed rating-sorted
+                                                      catalog from load_and_prepare_data's
+                                                      'lookups'.
 
     Returns:
         A dictionary with the recommended inverter details, or None if no suitable one is found.
     """
+    import numpy as np
+
     if inverter_df.empty:
-        logging.warning("Inverter DataFrame is empty. Cannot recommend inverter.")
+        logger.warning("Inverter DataFrame is empty. Cannot recommend inverter.")
         return None
 
     required_inverter_kw = required_wattage / 1000
 
     # Strategy: Find the smallest inverter that is still large enough to handle the load.
     # This is often the most cost-effective choice.
-    suitable_inverters = inverter_df[inverter_df['Inverter_Rating_kW'] >= required_inverter_kw]
-
-    if suitable_inverters.empty:
-        logging.warning(f"No suitable inverter found for a required power of {required_inverter_kw:.2f} kW. Selecting the largest available.")
-        # Fallback: recommend the largest inverter available
-        best_choice = inverter_df.loc[inverter_df['Inverter_Rating_kW'].idxmax()]
-    else:
-        # Select the one with the rating closest to our requirement (but still >=)
-        best_choice = suitable_inverters.loc[suitable_inverters['Inverter_Rating_kW'].idxmin()]
-
+    if sorted_inverters is None:
+        sorted_inverters = _cached_sorted_inverters(inverter_df)
+    ratings, fields, top = sorted_inverters
+
+    # Binary search for the first rating >= the requirement, i.e. the one closest to
+    # our requirement (but still >=); the stable sort makes it the first such inverter
+    # in frame order among equal ratings. Any hit is at or before `top`, so clamping
+    # to it also covers the fallback: the largest inverter available.
+    i = int(np.searchsorted(ratings, required_inverter_kw, side='left'))
+    if i == len(ratings):
+        logger.warning("No suitable inverter found for a required power of %.2f kW. Selecting the largest available.", required_inverter_kw)
+    best = min(i, top)
+
+    # Plain array indexing; no DataFrame is touched once the catalog is sorted
     recommendation = {
-        "inverter_brand": best_choice.get('Inverter_Brand', 'N/A'),
-        "inverter_model": best_choice.get('Inverter_Model', 'N/A'),
-        "inverter_rating_kw": best_choice.get('Inverter_Rating_kW'),
-        "inverter_efficiency": best_choice.get('Inverter_Efficiency_%')
+        key: fields[key][best] if key in fields else default
+        for key, _, default in _INVERTER_FIELDS
     }
-    logging.info(f"Inverter recommendation: {recommendation['inverter_brand']} {recommendation['inverter_model']} ({recommendation['inverter_rating_kw']} kW).")
+    logger.info("Inverter recommendation: %s %s (%s kW).", recommendation['inverter_brand'], recommendation['inverter_model'], recommendation['inverter_rating_kw'])
     return recommendation
 
-def recommend_batteries(daily_kwh_consumption: float, battery_df: pd.DataFrame, days_of_autonomy: int = 2) -> Optional[Dict[str, Any]]:
+def recommend_batteries(
+    daily_kwh_consumption: float,
+    battery_df: pd.DataFrame,
+    days_of_autonomy: int = 2,
+    choice: Optional[Tuple[Any, Dict[str, Any]]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Recommends a battery bank configuration.
 
@@ -121,41 +411,44 @@ def recommend_batteries(daily_kwh_consumption: float, battery_df: pd.DataFrame,
         daily_kwh_consumption (float): The user's average daily energy usage in kWh.
         battery_df (pd.DataFrame): DataFrame of available batteries.
         days_of_autonomy (int): How many days the battery bank should last without sun.
+        choice (Optional[Tuple]): The precomputed (usable kWh, row dict) of the battery to
+                                  use, from load_and_prepare_data's 'lookups'.
 
     Returns:
         A dictionary with the recommended battery details, or None if no suitable battery is found.
     """
     if battery_df.empty:
-        logging.warning("Battery DataFrame is empty. Cannot recommend batteries.")
+        logger.warning("Battery DataFrame is empty. Cannot recommend batteries.")
         return None
 
     # Calculate total required usable capacity
     required_usable_kwh = daily_kwh_consumption * days_of_autonomy
 
     # Strategy: Select the most common battery capacity available.
-    try:
-        target_battery_kwh = battery_df['Battery_Capacity_kWh_Usable'].mode()[0]
-    except KeyError:
-        logging.error("Column 'Battery_Capacity_kWh_Usable' not found in battery data.")
-        return None
+    if choice is None:
+        try:
+            choice = _mode_choice(battery_df, 'Battery_Capacity_kWh_Usable')
+        except KeyError:
+            logger.error("Column 'Battery_Capacity_kWh_Usable' not found in battery data.")
+            return None
+    target_battery_kwh, selected_battery = choice
 
     if target_battery_kwh == 0:
-        logging.warning("Most common battery has 0 usable kWh. Cannot proceed.")
+        logger.warning("Most common battery has 0 usable kWh. Cannot proceed.")
         return None
 
-    selected_battery = battery_df[battery_df['Battery_Capacity_kWh_Usable'] == target_battery_kwh].iloc[0]
-
-    number_of_batteries = np.ceil(required_usable_kwh / target_battery_kwh)
+    # Same exact ceiling division as for panels, on whole watt-hours
+    number_of_batteries = -(-round(required_usable_kwh * 1000) // round(float(target_battery_kwh) * 1000))
 
     recommendation = {
         "battery_brand": selected_battery.get('Battery_Brand', 'N/A'),
         "battery_model": selected_battery.get('Battery_Model', 'N/A'),
         "individual_battery_kwh_usable": target_battery_kwh,
-        "number_of_batteries": int(number_of_batteries),
-        "total_battery_kwh_usable": float(number_of_batteries * target_battery_kwh),
+        "number_of_batteries": number_of_batteries,
+        "total_battery_kwh_usable": number_of_batteries * float(target_battery_kwh),
         "days_of_autonomy": days_of_autonomy
     }
-    logging.info(f"Battery recommendation: {recommendation['number_of_batteries']} x {recommendation['battery_brand']} batteries for {days_of_autonomy} days of autonomy.")
+    logger.info("Battery recommendation: %s x %s batteries for %s days of autonomy.", number_of_batteries, recommendation['battery_brand'], days_of_autonomy)
     return recommendation
 
 def size_complete_system(
@@ -167,26 +460,33 @@ def size_complete_system(
     """
     Orchestrates the sizing of a complete solar power system.
     """
-    if not all(k in component_data for k in ['panels', 'inverters', 'batteries']):
-        logging.error("Component data is missing one or more key DataFrames: 'panels', 'inverters', 'batteries'.")
+    if not REQUIRED_COMPONENT_KEYS.issubset(component_data):
+        logger.error("Component data is missing one or more key DataFrames: 'panels', 'inverters', 'batteries'.")
         return None
 
-    # 1. Calculate required wattage
-    required_wattage = calculate_required_wattage(monthly_kwh_consumption, peak_sun_hours)
-    if required_wattage == 0:
+    # 1. Calculate required wattage; invalid inputs are rejected before any work
+    if not monthly_kwh_consumption > 0:
+        logger.warning("Monthly consumption must be a positive value.")
+        return None
+    if not peak_sun_hours > 0:
+        logger.warning("Peak sun hours must be a positive value.")
         return None
+    required_wattage = calculate_required_wattage(monthly_kwh_consumption, peak_sun_hours)
+
+    # Choices precomputed by load_and_prepare_data, if present
+    lookups = component_data.get('lookups') or {}
 
     # 2. Recommend panels
-    panel_rec = recommend_panels(required_wattage, component_data['panels'])
+    panel_rec = recommend_panels(required_wattage, component_data['panels'], lookups.get('panels'))
     if not panel_rec:
         return None # Cannot proceed without panels
 
     # 3. Recommend inverter based on final panel wattage
-    inverter_rec = recommend_inverter(panel_rec['total_panel_wattage'], component_data['inverters'])
+    inverter_rec = recommend_inverter(panel_rec['total_panel_wattage'], component_data['inverters'], lookups.get('inverters'))
 
     # 4. Recommend batteries based on daily consumption
     daily_kwh = monthly_kwh_consumption / 30
-    battery_rec = recommend_batteries(daily_kwh, component_data['batteries'], days_of_autonomy)
+    battery_rec = recommend_batteries(daily_kwh, component_data['batteries'], days_of_autonomy, lookups.get('batteries'))
 
     return {
         "system_requirements": {
@@ -199,7 +499,237 @@ def size_complete_system(
         "battery_recommendation": battery_rec
     }
 
+def _size_kernel_numpy(required_wattage, monthly_kwh, panel_wattage, battery_kwh, days_of_autonomy, ratings, top):
+    """
+    Batch sizing arithmetic as NumPy array operations. Returns the panel counts, total
+    panel wattages, inverter positions (into the rating-sorted catalog) and battery counts
+    (zeros when `battery_kwh` is 0); all int64 arrays.
+    """
+    import numpy as np
+
+    # Integer ceiling divisions on milliwatts / watt-hours, as in the recommenders
+    number_of_panels = -(-np.rint(required_wattage * 1000).astype(np.int64) // round(panel_wattage * 1000))
+    total_panel_wattage = (number_of_panels * panel_wattage).astype(np.int64)
+    if len(ratings):
+        # Households needing more than the largest inverter get the largest one
+        inverter_idx = np.minimum(np.searchsorted(ratings, total_panel_wattage / 1000, side='left'), top)
+    else:
+        inverter_idx = np.zeros(len(required_wattage), dtype=np.int64)
+    if battery_kwh > 0:
+        number_of_batteries = -(-np.rint(monthly_kwh / 30 * days_of_autonomy * 1000).astype(np.int64) // round(battery_kwh * 1000))
+    else:
+        number_of_batteries = np.zeros(len(required_wattage), dtype=np.int64)
+    return number_of_panels, total_panel_wattage, inverter_idx, number_of_batteries
+
+def _compile_size_kernel():
+    """
+    Compiles the computation of _size_kernel_numpy with numba, as one parallel loop
+    over households (numba.prange) with a hand-written left binary search for the
+    inverter. Compilation is forced here with a one-household warm-up call, so typing
+    errors surface to the caller rather than on first use. Requires numba.
+    """
+    import numba
+    import numpy as np
+
+    @numba.njit(parallel=True, cache=True)
+    def size_kernel_loop(required_wattage, monthly_kwh, panel_wattage, battery_kwh, days_of_autonomy, ratings, top):
+        n = required_wattage.shape[0]
+        m = ratings.shape[0]
+        panel_mw = int(np.rint(panel_wattage * 1000))
+        battery_wh = int(np.rint(battery_kwh * 1000))
+        number_of_panels = np.empty(n, dtype=np.int64)
+        total_panel_wattage = np.empty(n, dtype=np.int64)
+        inverter_idx = np.zeros(n, dtype=np.int64)
+        number_of_batteries = np.zeros(n, dtype=np.int64)
+        for k in numba.prange(n):
+            panels = -(-int(np.rint(required_wattage[k] * 1000)) // panel_mw)
+            total = int(panels * panel_wattage)
+            number_of_panels[k] = panels
+            total_panel_wattage[k] = total
+            if m > 0:
+                target_kw = total / 1000
+                lo, hi = 0, m
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if ratings[mid] < target_kw:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                inverter_idx[k] = min(lo, top)
+            if battery_kwh > 0:
+                number_of_batteries[k] = -(-int(np.rint(monthly_kwh[k] / 30 * days_of_autonomy * 1000)) // battery_wh)
+        return number_of_panels, total_panel_wattage, inverter_idx, number_of_batteries
+
+    # Argument types match the call in size_complete_system_batch
+    one = np.ones(1, dtype=np.float64)
+    size_kernel_loop(one, one, 1.0, 1.0, 1.0, one, 0)
+    return size_kernel_loop
+
+@functools.lru_cache(maxsize=None)
+def _get_size_kernel():
+    """Returns the numba-compiled batch kernel if numba is usable, else the NumPy one."""
+    if NUMBA_AVAILABLE:
+        try:
+            return _compile_size_kernel()
+        except Exception as e:
+            logger.warning("numba is installed but could not compile the sizing kernel (%s); using NumPy.", e)
+    return _size_kernel_numpy
+
+def _valid_mask(monthly_kwh: np.ndarray, peak_sun_hours: float) -> np.ndarray:
+    """
+    Returns a boolean mask of the households that can be sized: positive monthly
+    consumption, given positive peak sun hours (shared by all households; if they
+    are not positive, no household can be sized). NaNs compare false, so they are
+    rejected as well.
+    """
+    import numpy as np
+
+    if not peak_sun_hours > 0:
+        return np.zeros(monthly_kwh.shape, dtype=bool)
+    return monthly_kwh > 0
+
+def size_complete_system_batch(
+    monthly_kwh_consumption: np.ndarray,
+    component_data: Dict[str, Any],
+    peak_sun_hours: float = 5.0,
+    days_of_autonomy: int = 2
+) -> Optional[pd.DataFrame]:
+    """
+    Sizes systems for many households at once; the vectorized form of size_complete_system.
+
+    Every household gets the same panel and battery model (the most common size in the
+    catalog), so only the counts vary. These, and the inverter choice, are computed by
+    one array kernel (numba-compiled when available) rather than one
+    size_complete_system call per household.
+
+    Args:
+        monthly_kwh_consumption (np.ndarray): Monthly consumption in kWh, one entry per household.
+        component_data (Dict): The output of load_and_prepare_data.
+        peak_sun_hours (float): Average peak sun hours for the location.
+        days_of_autonomy (int): Desired days of battery backup.
+
+    Returns:
+        A DataFrame with one row per household that could be sized, holding the same
+        values as size_complete_system's panel, inverter and battery recommendations.
+        The index is each household's position in the input; households with
+        non-positive consumption (or all of them, if the peak sun hours are not
+        positive) are omitted. Battery columns are missing values when no battery
+        can be recommended. None if the component data is invalid or has
+        no panels.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not REQUIRED_COMPONENT_KEYS.issubset(component_data):
+        logger.error("Component data is missing one or more key DataFrames: 'panels', 'inverters', 'batteries'.")
+        return None
+
+    panel_df = component_data['panels']
+    inverter_df = component_data['inverters']
+    battery_df = component_data['batteries']
+    if panel_df.empty:
+        logger.warning("Panel DataFrame is empty. Cannot recommend panels.")
+        return None
+    lookups = component_data.get('lookups') or {}
+
+    monthly_kwh = np.asarray(monthly_kwh_consumption, dtype=np.float64)
+
+    # 1. Drop invalid households up front, then compute the required wattage
+    # for the remaining ones only
+    valid = _valid_mask(monthly_kwh, peak_sun_hours)
+    positions = np.flatnonzero(valid)
+    if len(positions) < len(monthly_kwh):
+        logger.warning("Skipping %d households with non-positive consumption or peak sun hours.", len(monthly_kwh) - len(positions))
+    monthly_kwh = monthly_kwh[positions]
+    required_wattage = calculate_required_wattage_batch(monthly_kwh, peak_sun_hours) if len(positions) else monthly_kwh
+
+    result = {
+        "monthly_kwh_consumption": monthly_kwh,
+        "initial_required_wattage": np.round(required_wattage).astype(np.int64)
+    }
+
+    # 2-4. Panel counts, inverter choices and battery counts in one kernel call.
+    # Every household gets the same panel and battery model.
+    panel_wattage, selected_panel = lookups.get('panels') or _mode_choice(panel_df, 'Panel_Wattage_W')
+    if inverter_df.empty:
+        ratings, fields, top = np.empty(0), None, 0
+    else:
+        ratings, fields, top = lookups.get('inverters') or _cached_sorted_inverters(inverter_df)
+    battery_choice = None
+    if not battery_df.empty:
+        battery_choice = lookups.get('batteries') or _mode_choice(battery_df, 'Battery_Capacity_kWh_Usable')
+    has_battery = battery_choice is not None and battery_choice[0] != 0
+    battery_kwh = float(battery_choice[0]) if has_battery else 0.0
+
+    number_of_panels, total_panel_wattage, inverter_idx, number_of_batteries = _get_size_kernel()(
+        required_wattage, monthly_kwh, float(panel_wattage), battery_kwh,
+        float(days_of_autonomy), ratings, top
+    )
+
+    result.update({
+        "panel_brand": selected_panel.get('Panel_Brand', 'N/A'),
+        "panel_model": selected_panel.get('Panel_Model', 'N/A'),
+        "individual_panel_wattage": panel_wattage,
+        "number_of_panels": number_of_panels,
+        "total_panel_wattage": total_panel_wattage
+    })
+
+    if fields is not None:
+        # Gather each inverter field straight from its rating-ordered array
+        for key, _, default in _INVERTER_FIELDS:
+            result[key] = fields[key][inverter_idx] if key in fields else default
+
+    if has_battery:
+        selected_battery = battery_choice[1]
+        result.update({
+            "battery_brand": selected_battery.get('Battery_Brand', 'N/A'),
+            "battery_model": selected_battery.get('Battery_Model', 'N/A'),
+            "individual_battery_kwh_usable": battery_choice[0],
+            "number_of_batteries": number_of_batteries,
+            "total_battery_kwh_usable": number_of_batteries * battery_choice[0],
+            "days_of_autonomy": days_of_autonomy
+        })
+    else:
+        logger.warning("No battery can be recommended for this catalog.")
+
+    return pd.DataFrame(result, index=positions)
+
+def save_batch_sizing(result: pd.DataFrame, filepath: str) -> None:
+    """
+    Saves the output of size_complete_system_batch as a single columnar file.
+
+    With pyarrow the frame is converted to an Arrow table and written to a
+    zstd-compressed Parquet file in one write_table call. Its string columns are
+    dictionary-encoded, since every household shares a handful of models.
+    Without pyarrow the results are written as CSV next to `filepath` instead.
+
+    Args:
+        result (pd.DataFrame): The batch sizing results, indexed by household position.
+        filepath (str): The path of the Parquet file to write.
+    """
+    import numpy as np
+
+    if not PYARROW_AVAILABLE:
+        csv_filepath = os.path.splitext(filepath)[0] + '.csv'
+        logger.warning("pyarrow is not installed. Saving batch sizing results as CSV to '%s'.", csv_filepath)
+        result.to_csv(csv_filepath, index_label='household')
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(
+        result.rename_axis('household').astype({
+            col: 'category' for col in result.columns if result[col].dtype == np.object_
+        }),
+        preserve_index=True
+    )
+    pq.write_table(table, filepath, compression='zstd')
+    logger.info("Saved batch sizing results for %d households to '%s'.", table.num_rows, filepath)
+
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     print("--- Solar System Sizing Demonstration ---")
 
     # Load component data
@@ -217,17 +747,24 @@ if __name__ == '__main__':
         )
 
         if system_recommendation:
-            # Helper to convert numpy types to native Python types for JSON serialization
-            def convert_numpy_types(obj):
-                if isinstance(obj, np.integer):
-                    return int(obj)
-                elif isinstance(obj, np.floating):
-                    return float(obj)
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                return obj
-
-            import json
-            print(json.dumps(system_recommendation, indent=2, default=convert_numpy_types))
+            if ORJSON_AVAILABLE:
+                print(orjson.dumps(
+                    system_recommendation,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+                ).decode())
+            else:
+                # Helper to convert numpy types to native Python types for JSON serialization
+                import numpy as np
+
+                def convert_numpy_types(obj):
+                    if isinstance(obj, np.integer):
+                        return int(obj)
+                    elif isinstance(obj, np.floating):
+                        return float(obj)
+                    elif isinstance(obj, np.ndarray):
+                        return obj.tolist()
+                    return obj
+
+                print(json.dumps(system_recommendation, indent=2, default=convert_numpy_types))
     else:
         print("\nCould not run demonstration because component data failed to load.")
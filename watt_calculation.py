@@ -1,11 +1,20 @@
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Module logger; handlers and levels are configured by the entry point
+logger = logging.getLogger(__name__)
 
 # Constants
 DAYS_IN_MONTH = 30
 SYSTEM_LOSS_FACTOR = 1.25 # Accounts for ~25% energy loss in the system (inverter, wiring, dirt, etc.)
+# Watts of array needed per (kWh/day) per peak sun hour, after losses
+WATTS_PER_KWH_AFTER_LOSSES = SYSTEM_LOSS_FACTOR * 1000.0
+
+def _required_wattage(monthly_kwh_consumption, peak_sun_hours):
+    # monthly kWh / DAYS_IN_MONTH = daily consumption; x SYSTEM_LOSS_FACTOR = daily
+    # generation after losses; / peak_sun_hours = array kW; x 1000 = W. Folded into a
+    # single multiply and divide: for whole kWh the product is exact, so the result is
+    # correctly rounded and exact-multiple panel counts don't pick up a spurious +1.
+    return monthly_kwh_consumption * WATTS_PER_KWH_AFTER_LOSSES / (DAYS_IN_MONTH * peak_sun_hours)
 
 def calculate_required_wattage(
     monthly_kwh_consumption: float,
@@ -25,34 +34,59 @@ def calculate_required_wattage(
         float: The total DC wattage required from the solar panel array.
     """
     if monthly_kwh_consumption <= 0:
-        logging.warning("Monthly consumption must be a positive value.")
+        logger.warning("Monthly consumption must be a positive value.")
         return 0.0
     if peak_sun_hours <= 0:
-        logging.warning("Peak sun hours must be a positive value.")
+        logger.warning("Peak sun hours must be a positive value.")
         return 0.0
 
-    # 1. Calculate average daily energy consumption in kWh
-    daily_kwh_consumption = monthly_kwh_consumption / DAYS_IN_MONTH
-    logging.info(f"Average daily consumption: {daily_kwh_consumption:.2f} kWh")
+    required_wattage = _required_wattage(monthly_kwh_consumption, peak_sun_hours)
+
+    # Only format the intermediate figures when they will actually be logged
+    if logger.isEnabledFor(logging.INFO):
+        daily_kwh_consumption = monthly_kwh_consumption / DAYS_IN_MONTH
+        logger.info("Average daily consumption: %.2f kWh", daily_kwh_consumption)
+        logger.info("Required daily generation (after accounting for losses): %.2f kWh", daily_kwh_consumption * SYSTEM_LOSS_FACTOR)
+        logger.info("Required solar array power: %.2f kW", required_wattage / 1000)
+        logger.info("Total required solar panel wattage: %.2f W", required_wattage)
+
+    return required_wattage
+
+def calculate_required_wattage_batch(
+    monthly_kwh_consumption: "np.ndarray",
+    peak_sun_hours: float = 5.0
+) -> "np.ndarray":
+    """
+    Vectorized calculate_required_wattage for an array of monthly consumptions.
 
-    # 2. Account for system losses
-    # The solar array needs to generate more power than consumed to make up for losses.
-    required_daily_generation = daily_kwh_consumption * SYSTEM_LOSS_FACTOR
-    logging.info(f"Required daily generation (after accounting for losses): {required_daily_generation:.2f} kWh")
+    Args:
+        monthly_kwh_consumption (np.ndarray): Monthly consumption in kWh, one entry per household.
+        peak_sun_hours (float): The average number of peak sun hours per day.
 
-    # 3. Calculate the required DC power of the solar array in kW
-    # This is the amount of power the panels need to produce each hour during peak sun.
-    required_kw_power = required_daily_generation / peak_sun_hours
-    logging.info(f"Required solar array power: {required_kw_power:.2f} kW")
+    Returns:
+        np.ndarray: The required DC wattage per household (float64), 0.0 where the
+                    consumption or peak sun hours are not positive.
+    """
+    # Imported here so the scalar calculator stays dependency-free
+    import numpy as np
 
-    # 4. Convert kW to Watts
-    required_wattage = required_kw_power * 1000
+    monthly_kwh_consumption = np.asarray(monthly_kwh_consumption, dtype=np.float64)
+    if peak_sun_hours <= 0:
+        logger.warning("Peak sun hours must be a positive value.")
+        return np.zeros_like(monthly_kwh_consumption)
 
-    logging.info(f"Total required solar panel wattage: {required_wattage:.2f} W")
+    # Same formula as calculate_required_wattage, applied to the whole array
+    required_wattage = _required_wattage(monthly_kwh_consumption, peak_sun_hours)
 
+    invalid = ~(monthly_kwh_consumption > 0)
+    if invalid.any():
+        logger.warning("%d monthly consumption values are not positive.", int(invalid.sum()))
+        required_wattage[invalid] = 0.0
     return required_wattage
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     # This is a simple demonstration of how to use the function.
     print("--- Solar Wattage Calculator ---")
 